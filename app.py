@@ -1,52 +1,10 @@
 # app.py (전체 통합)
-import os
-import re
-import tempfile
-import fitz  # PyMuPDF
-import pandas as pd
-import streamlit as st
-from datetime import datetime
-from ltv_map import region_map
-from history_manager import (
-    get_customer_options,
-    load_customer_input,
-    save_user_input
-)
-
-# ------------------------------
-# 📌 주소 정규화 함수
-# ------------------------------
-def normalize_address_to_region(address: str):
-    try:
-        addr_clean = re.sub(r"\s+", " ", address)
-        match = re.match(r"([가-힣]+시|[가-힣]+도)\s+([가-힣]+[구군])\s+([가-힣0-9]+동)", addr_clean)
-        if not match:
-            return 0, ""
-
-        시도, 시군구, 행정동 = match.groups()
-        df = pd.read_excel("대한민국행정동.xlsx")
-
-        filtered = df[
-            (df["시도"] == 시도) &
-            (df["시군구"] == 시군구) &
-            (df["행정동"] == 행정동)
-        ]
-
-        if filtered.empty:
-            return 0, ""
-
-        hf_region = filtered.iloc[0]["HF_지역명_매핑"]
-        deduct = region_map.get(hf_region, 0)
-        return deduct, hf_region
-
-    except Exception:
-        return 0, ""
-    
 import os
 import re
 import sys
 import base64
-import tempfile
+import time
+import uuid
 import subprocess
 import webbrowser
 import platform
@@ -57,12 +15,21 @@ import pandas as pd
 import streamlit as st
 
 from ltv_map import region_map
+from session_store import document_store, format_bytes
+from pdf_utils import process_pdf, pdf_to_image, pdf_page_count
+from ltv_calc import parse_korean_number, compute_limits, loan_sums, price_type_for_floor
+from loan_schema import decode_loans
+from report_export import ReportJob, REPORT_FORMATS, DEFAULT_LTVS, MIME_TYPES
+from rerun_stats import timed_section, record, stats_rows
+from price_provider import get_price_client, price_key
 from history_manager import (
-    get_customer_options,
+    CUSTOMER_PAGE_SIZE,
+    search_customer_page,
     load_customer_input,
+    list_customer_versions,
     cleanup_old_history,
-    search_customers_by_keyword
-    # 🔴 ARCHIVE_FILE 제거! 더 이상 필요 없음
+    search_customers_by_keyword,
+    ARCHIVE_FILE,
 )
 
 # ─────────────────────────────
@@ -77,69 +44,7 @@ st.set_page_config(
     initial_sidebar_state="auto"
 )
 
-# ------------------------------
-# 🔹 텍스트 기반 추출 함수들
-# ------------------------------
-
-def extract_address(text):
-    m = re.search(r"\[집합건물\]\s*([^\n]+)", text)
-    if m:
-        return m.group(1).strip()
-    m = re.search(r"소재지\s*[:：]?\s*([^\n]+)", text)
-    if m:
-        return m.group(1).strip()
-    return ""
-
-def extract_area_floor(text):
-    m = re.findall(r"(\d+\.\d+)\s*㎡", text.replace('\n', ' '))
-    area = f"{m[-1]}㎡" if m else ""
-    floor = None
-    addr = extract_address(text)
-    f_match = re.findall(r"제(\d+)층", addr)
-    if f_match:
-        floor = int(f_match[-1])
-    return area, floor
-
-def extract_all_names_and_births(text):
-    start = text.find("주요 등기사항 요약")
-    if start == -1:
-        return []
-    summary = text[start:]
-    lines = [l.strip() for l in summary.splitlines() if l.strip()]
-    result = []
-    for i in range(len(lines)):
-        if re.match(r"[가-힣]+ \(공유자\)|[가-힣]+ \(소유자\)", lines[i]):
-            name = re.match(r"([가-힣]+)", lines[i]).group(1)
-            if i + 1 < len(lines):
-                birth_match = re.match(r"(\d{6})-", lines[i + 1])
-                if birth_match:
-                    birth = birth_match.group(1)
-                    result.append((name, birth))
-    return result
-
-# ------------------------------
-# 🔹 PDF 처리 함수
-# ------------------------------
-
-def process_pdf(uploaded_file):
-    doc = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-    text = ""
-    external_links = []
-
-    for page in doc:
-        text += page.get_text("text")
-        links = page.get_links()
-        for link in links:
-            if "uri" in link:
-                external_links.append(link["uri"])
-
-    doc.close()
-
-    address = extract_address(text)
-    area, floor = extract_area_floor(text)
-    co_owners = extract_all_names_and_births(text)
-
-    return text, external_links, address, area, floor, co_owners
+script_started = time.perf_counter()
 
 # ------------------------------
 # 🔹 유틸 함수
@@ -148,15 +53,6 @@ def process_pdf(uploaded_file):
 def floor_to_unit(value, unit=100):
     return value // unit * unit
 
-def pdf_to_image(pdf_path, page_num, zoom=2.0):
-    doc = fitz.open(pdf_path)
-    if page_num >= len(doc):
-        return None
-    page = doc.load_page(page_num)
-    mat = fitz.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=mat)
-    return pix.tobytes("png")
-
 
 def format_with_comma(key):
     raw = st.session_state.get(key, "")
@@ -166,25 +62,6 @@ def format_with_comma(key):
     else:
         st.session_state[key] = ""
 
-def parse_korean_number(text: str) -> int:
-    txt = text.replace(",", "").strip()
-    total = 0
-    m = re.search(r"(\d+)\s*억", txt)
-    if m:
-        total += int(m.group(1)) * 10000
-    m = re.search(r"(\d+)\s*천만", txt)
-    if m:
-        total += int(m.group(1)) * 1000
-    m = re.search(r"(\d+)\s*만", txt)
-    if m:
-        total += int(m.group(1))
-    if total == 0:
-        try:
-            total = int(txt)
-        except:
-            total = 0
-    return total
-
 def format_kb_price():
     raw = st.session_state.get("raw_price_input", "")
     clean = parse_korean_number(raw)
@@ -195,16 +72,55 @@ def format_area():
     clean = re.sub(r"[^\d.]", "", raw)
     st.session_state["extracted_area"] = f"{clean}㎡" if clean else ""
 
-def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
-    if is_senior:
-        limit = int(total_value * (ltv / 100) - deduction)
-        available = int(limit - principal_sum)
-    else:
-        limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
-        available = int(limit - principal_sum)
-    limit = (limit // 10) * 10
-    available = (available // 10) * 10
-    return limit, available
+
+# ------------------------------
+# 🔹 PDF 미리보기 (fragment)
+# ------------------------------
+
+def move_page(step, total_pages):
+    new_index = st.session_state.page_index + step
+    if 0 <= new_index < total_pages:
+        st.session_state.page_index = new_index
+
+# 저장소에서 원본이 축출됐으면 업로더가 가진 파일에서 다시 넣는다
+def load_pdf_bytes(session_id, pdf_key):
+    data = document_store.get(session_id, pdf_key)
+    uploaded = st.session_state.get("pdf_uploader")
+    if data is None and uploaded is not None:
+        data = uploaded.getvalue()
+        document_store.put(session_id, data, key=pdf_key)
+    return data
+
+@st.fragment
+def render_pdf_preview(session_id, pdf_key, total_pages):
+    with timed_section("preview"):
+        page_index = st.session_state.page_index
+
+        # 미리보기 이미지 렌더링 (페이지별 PNG 캐시)
+        def cached_page_image(page_num, zoom=2.0):
+            return document_store.get_or_create(
+                session_id, f"{pdf_key}:png:{page_num}:{zoom}",
+                lambda: pdf_to_image(load_pdf_bytes(session_id, pdf_key), page_num, zoom),
+                parent=pdf_key,
+            )
+
+        # 좌측 페이지
+        img1 = cached_page_image(page_index)
+        # 우측 페이지 (있을 경우)
+        img2 = cached_page_image(page_index + 1) if page_index + 1 < total_pages else None
+
+        cols = st.columns(2)
+        with cols[0]:
+            if img1: st.image(img1, caption=f"{page_index + 1} 페이지")
+        with cols[1]:
+            if img2: st.image(img2, caption=f"{page_index + 2} 페이지")
+
+        # 이전/다음 버튼 (콜백에서 인덱스를 먼저 바꿔 클릭 즉시 반영)
+        col_prev, _, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("⬅️ 이전 페이지", key="page_prev", on_click=move_page, args=(-2, total_pages), disabled=page_index < 2)
+        with col_next:
+            st.button("➡️ 다음 페이지", key="page_next", on_click=move_page, args=(2, total_pages), disabled=page_index + 2 >= total_pages)
 
 
 # ------------------------------
@@ -215,56 +131,65 @@ for key in ["extracted_address", "extracted_area", "raw_price", "co_owners", "ex
     if key not in st.session_state:
         st.session_state[key] = "" if key != "co_owners" else []
 
-uploaded_file = st.file_uploader("📎 PDF 파일 업로드", type="pdf")
+# ✅ 세션 식별자 + 유휴 세션 정리 (큰 데이터는 document_store 에만 보관)
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+session_id = st.session_state["session_id"]
+document_store.touch(session_id)
+document_store.sweep_idle()
+
+uploaded_file = st.file_uploader("📎 PDF 파일 업로드", type="pdf", key="pdf_uploader")
 
 if uploaded_file:
-    # 1. PDF 텍스트 추출 및 메타정보 세션 저장
-    text, external_links, address, area, floor, co_owners = process_pdf(uploaded_file)
-    st.session_state["extracted_address"] = address
-    st.session_state["extracted_area"] = area
-    st.session_state["extracted_floor"] = floor
-    st.session_state["co_owners"] = co_owners
+    # 1. PDF 원본은 해시 키로 공유 저장소에 보관 (세션에는 키만 저장)
+    #    업로드 파일이 바뀐 재실행에서만 원본을 읽어 해시하고, 그 외에는 세션의 키를 그대로 쓴다
+    file_id = getattr(uploaded_file, "file_id", None)
+    is_new_pdf = False
+    if file_id is None or file_id != st.session_state.get("pdf_file_id") or not st.session_state.get("pdf_key"):
+        pdf_key = document_store.put(session_id, uploaded_file.getvalue())
+        is_new_pdf = st.session_state.get("pdf_key") != pdf_key
+        if is_new_pdf:
+            if st.session_state.get("pdf_key"):
+                # 이전 PDF 원본 + 파생 항목(:parsed, :pages, :png) 함께 반환
+                document_store.release(session_id, st.session_state["pdf_key"])
+            st.session_state["pdf_key"] = pdf_key
+            st.session_state.page_index = 0
+        st.session_state["pdf_file_id"] = file_id
+    pdf_key = st.session_state["pdf_key"]
+
+    # 2. PDF 텍스트 추출 결과도 저장소에 캐시 (축출되면 원본에서 다시 추출)
+    text, external_links, address, area, floor, co_owners = document_store.get_or_create(
+        session_id, f"{pdf_key}:parsed", lambda: process_pdf(load_pdf_bytes(session_id, pdf_key)), parent=pdf_key
+    )
+    if is_new_pdf:
+        st.session_state["extracted_address"] = address
+        st.session_state["extracted_area"] = area
+        st.session_state["extracted_floor"] = floor
+        st.session_state["co_owners"] = co_owners
+
+        # KB시세 자동 조회 (KB_PRICE_PROVIDER 가 설정된 경우, 주소 · 전용면적 · 층 기준)
+        st.session_state.pop("auto_kb_price", None)
+        price_client = get_price_client()
+        if price_client and address:
+            key = price_key(address, area, floor)
+            price = price_client.get(key, timeout=10)
+            if price:
+                st.session_state["raw_price"] = f"{price:,}"
+                st.session_state["raw_price_input"] = f"{price:,}"
+                st.session_state["auto_kb_price"] = (price, key.price_type)
     st.success(f"📍 PDF에서 주소 추출: {address}")
 
-    # 2. 임시 PDF 파일 저장 (한번만)
-    if "uploaded_pdf_path" not in st.session_state:
-        uploaded_file.seek(0)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(uploaded_file.getbuffer())
-            st.session_state["uploaded_pdf_path"] = tmp_file.name
-
-    pdf_path = st.session_state["uploaded_pdf_path"]
-    doc = fitz.open(pdf_path)
-    total_pages = len(doc)
-    doc.close()  # ✅ 꼭 닫아주세요!
+    total_pages = document_store.get_or_create(
+        session_id, f"{pdf_key}:pages", lambda: pdf_page_count(load_pdf_bytes(session_id, pdf_key)), parent=pdf_key
+    )
 
 
     # 3. 페이지 인덱스 세션 초기화
     if "page_index" not in st.session_state:
         st.session_state.page_index = 0
-    page_index = st.session_state.page_index
-
-
-    # 4. 미리보기 이미지 렌더링
-    # 좌측 페이지
-    img1 = pdf_to_image(pdf_path, page_index)
-    # 우측 페이지 (있을 경우)
-    img2 = pdf_to_image(pdf_path, page_index + 1) if page_index + 1 < total_pages else None
-
-    cols = st.columns(2)
-    with cols[0]:
-        if img1: st.image(img1, caption=f"{page_index + 1} 페이지")
-    with cols[1]:
-        if img2: st.image(img2, caption=f"{page_index + 2} 페이지")
-
-    # 5. 이전/다음 버튼
-    col_prev, _, col_next = st.columns([1, 2, 1])
-    with col_prev:
-        if st.button("⬅️ 이전 페이지") and page_index >= 2:
-            st.session_state.page_index -= 2
-    with col_next:
-        if st.button("➡️ 다음 페이지") and page_index + 2 < total_pages:
-            st.session_state.page_index += 2
+
+    # 4~5. 미리보기 + 이전/다음 (fragment: 페이지 이동 시 이 영역만 재실행)
+    render_pdf_preview(session_id, pdf_key, total_pages)
 
     # 56. 외부 링크 경고
     if external_links:
@@ -272,24 +197,113 @@ if uploaded_file:
         for uri in external_links:
             st.code(uri)
 
+elif st.session_state.get("pdf_key"):
+    # 업로드 해제 시 원본 + 파생 항목 저장소 참조도 즉시 반환
+    document_store.release(session_id, st.session_state.pop("pdf_key"))
+    st.session_state.pop("pdf_file_id", None)
+
+# ✅ 세션 메모리 사용량
+with st.sidebar.expander("🧠 메모리 사용량"):
+    mem = document_store.metrics()
+    st.write(f"현재 세션: {format_bytes(document_store.session_bytes(session_id))} / {format_bytes(mem['session_budget'])}")
+    st.write(f"현재 세션 항목: {mem['sessions'].get(session_id, {}).get('items', 0)}개")
+    # 다른 세션의 식별자 / 사용량은 보여주지 않고 전체 합계만 표시
+    st.write(f"전체: {format_bytes(mem['global_bytes'])} / {format_bytes(mem['global_budget'])} · "
+             f"세션 {len(mem['sessions'])}개 · 항목 {mem['blob_count']}개 · 축출 {mem['evictions']}회")
+
+# ✅ 월말 일괄 리포트 (백그라운드 스레드에서 생성, 진행률은 재실행 시 갱신)
+with st.sidebar.expander("📊 일괄 LTV 리포트"):
+    report_fmt = st.selectbox("형식", REPORT_FORMATS, key="report_fmt")
+    report_ltv_text = st.text_input("LTV 비율 (%, 쉼표 구분)", ", ".join(map(str, DEFAULT_LTVS)), key="report_ltvs")
+    report_ltvs = [int(v) for v in re.findall(r"\d+", report_ltv_text) if 1 <= int(v) <= 100] or list(DEFAULT_LTVS)
+    job = st.session_state.get("report_job")
+    if job is None or job.finished:
+        if st.button("리포트 생성", key="report_start"):
+            st.session_state["report_job"] = job = ReportJob(report_fmt, report_ltvs).start()
+    if job is not None:
+        st.progress(job.progress, text=f"{job.status} · {job.done:,}/{job.total:,}명")
+        if not job.finished:
+            col_refresh, col_cancel = st.columns(2)
+            col_refresh.button("진행률 새로고침", key="report_refresh")
+            if col_cancel.button("취소", key="report_cancel"):
+                job.cancel()
+        elif job.error:
+            st.error(f"❌ 리포트 생성 실패: {job.error}")
+        elif os.path.exists(job.path):
+            with open(job.path, "rb") as f:
+                st.download_button("📥 리포트 다운로드", data=f, file_name=os.path.basename(job.path),
+                                   mime=MIME_TYPES[job.fmt], key="report_download")
+
 # ------------------------------
 # 🔹 주소 및 고객명 UI
 # ------------------------------
 row1_col1, row1_col2, row1_col3 = st.columns([1, 1, 1])
 
+# 콜백에서 처리해야 선택 상자 값도 함께 비울 수 있음
+def delete_loaded_customer(name):
+    cleanup_old_history(name)
+    st.session_state.pop("loaded_customer", None)
+    st.session_state["load_customer_select"] = ""
+    st.session_state["deleted_customer"] = name
+
+# 선택이 바뀔 때만(콜백) 불러와야 이후 입력한 값이 재실행마다 덮어써지지 않는다.
+# 빈 값을 고르면 불러온 고객을 해제 → 같은 고객을 다시 고르면 저장된 값으로 다시 불러옴
+def load_selected_customer():
+    name = st.session_state.get("load_customer_select")
+    if not name:
+        st.session_state.pop("loaded_customer", None)
+        return
+    load_customer_input(name)
+    st.session_state["loaded_customer"] = name
+    st.session_state["customer_loaded_notice"] = name
+
+def reset_customer_page():
+    st.session_state["customer_page"] = 0
+
+def move_customer_page(step):
+    st.session_state["customer_page"] = max(0, st.session_state.get("customer_page", 0) + step)
+
+# ✅ 고객 선택: 검색어 기준 한 페이지(CUSTOMER_PAGE_SIZE명)만 서버에서 조회해 표시
 with row1_col1:
-    customer_list = get_customer_options()
-    selected_from_list = st.selectbox("고객 선택", [""] + list(customer_list), key="load_customer_select")
-
-# 초기값으로 항상 정의
-ARCHIVE_FILE = "deleted_archive.xlsx"
-
-# ✅ 선택 즉시 불러오기
-if selected_from_list:
-    load_customer_input(selected_from_list)
-    st.success(f"✅ {selected_from_list}님의 데이터가 불러와졌습니다.")
+    customer_query = st.text_input("고객 검색", key="customer_query", placeholder="이름 일부 입력", on_change=reset_customer_page)
+    customer_page = st.session_state.get("customer_page", 0)
+    customer_list, customer_total = search_customer_page(customer_query, customer_page, CUSTOMER_PAGE_SIZE)
+    if not customer_list and customer_page > 0:  # 삭제 등으로 페이지가 사라진 경우 마지막 페이지로
+        customer_page = st.session_state["customer_page"] = max(0, (customer_total - 1) // CUSTOMER_PAGE_SIZE)
+        customer_list, customer_total = search_customer_page(customer_query, customer_page, CUSTOMER_PAGE_SIZE)
+    st.selectbox("고객 선택", [""] + list(customer_list), key="load_customer_select", on_change=load_selected_customer)
+    if customer_total > CUSTOMER_PAGE_SIZE:
+        page_start = customer_page * CUSTOMER_PAGE_SIZE
+        col_prev_page, col_page_info, col_next_page = st.columns([1, 2, 1])
+        col_prev_page.button("◀", key="customer_prev", on_click=move_customer_page, args=(-1,), disabled=customer_page == 0)
+        col_page_info.caption(f"{customer_total:,}명 중 {page_start + 1:,}–{min(page_start + CUSTOMER_PAGE_SIZE, customer_total):,}")
+        col_next_page.button("▶", key="customer_next", on_click=move_customer_page, args=(1,),
+                             disabled=page_start + CUSTOMER_PAGE_SIZE >= customer_total)
+
+
+# ✅ 선택 즉시 불러오기 (load_selected_customer 콜백)
+if st.session_state.get("customer_loaded_notice"):
+    st.success(f"✅ {st.session_state.pop('customer_loaded_notice')}님의 데이터가 불러와졌습니다.")
+
+# ✅ 저장 버전 목록 + 특정 시점 불러오기
+with row1_col2:
+    loaded_name = st.session_state.get("loaded_customer")
+    if loaded_name:
+        versions = list_customer_versions(loaded_name)
+        with st.expander(f"🕓 버전 기록 ({len(versions)}건)"):
+            st.dataframe(pd.DataFrame(versions[::-1]), hide_index=True)
+            saved_points = [v["저장일시"] for v in versions[::-1] if v["구분"] != "삭제"]
+            as_of = st.selectbox("불러올 시점", saved_points, key="version_as_of")
+            if as_of and st.button("이 시점으로 불러오기", key="load_version_button"):
+                load_customer_input(loaded_name, as_of=as_of)
+                st.success(f"✅ {loaded_name}님의 {as_of} 기록을 불러왔습니다.")
 
 with row1_col3:
+    # ✅ 불러온 고객 삭제 (버전 기록에 삭제 표시 → 엑셀 아카이브 + Notion 삭제 기록)
+    if loaded_name:
+        st.button(f"🗑 {loaded_name} 삭제", key="delete_customer_button", on_click=delete_loaded_customer, args=(loaded_name,))
+    if st.session_state.get("deleted_customer"):
+        st.success(f"🗑 {st.session_state.pop('deleted_customer')}님의 기록을 삭제했습니다.")
     if st.session_state.get("deleted_data_ready", False):
         if os.path.exists(ARCHIVE_FILE):
             with open(ARCHIVE_FILE, "rb") as f:
@@ -315,13 +329,19 @@ with info_col2:
     customer_name = st.text_input("고객명", default_name_text, key="customer_name")
 
 
+# 지역을 바꾸면 방공제 금액을 그 지역 기본값으로 (이후 수기 수정 가능, 둘 다 저장 / 불러오기 대상)
+def apply_region_deduction():
+    st.session_state["deduction_input"] = f"{region_map.get(st.session_state.get('region', ''), 0):,}"
+
 col1, col2 = st.columns(2)
 with col1:
-    region = st.selectbox("방공제 지역 선택", [""] + list(region_map.keys()))
+    region = st.selectbox("방공제 지역 선택", [""] + list(region_map.keys()), key="region", on_change=apply_region_deduction)
     default_d = region_map.get(region, 0)
 
+if "deduction_input" not in st.session_state:
+    st.session_state["deduction_input"] = f"{default_d:,}"
 with col2:
-    manual_d = st.text_input("방공제 금액 (만)", f"{default_d:,}")
+    manual_d = st.text_input("방공제 금액 (만)", key="deduction_input")
 
 col3, col4 = st.columns(2)
 with col3:
@@ -345,7 +365,7 @@ except Exception as e:
 floor_match = re.findall(r"제(\d+)층", address_input)
 floor_num = int(floor_match[-1]) if floor_match else None
 if floor_num is not None:
-    if floor_num <= 2:
+    if price_type_for_floor(floor_num) == "하안가":
         st.markdown('<span style="color:red; font-weight:bold; font-size:18px">📉 하안가</span>', unsafe_allow_html=True)
     else:
         st.markdown('<span style="color:#007BFF; font-weight:bold; font-size:18px">📈 일반가</span>', unsafe_allow_html=True)
@@ -356,6 +376,9 @@ if floor_num is not None:
 col1, col2, col3 = st.columns(3)
 
 with col1:
+    if st.session_state.get("auto_kb_price"):
+        auto_price, auto_type = st.session_state["auto_kb_price"]
+        st.caption(f"🏷 KB시세 자동조회: {auto_price:,}만 ({auto_type})")
     if st.button("KB 시세 조회"):
         st.components.v1.html("<script>window.open('https://kbland.kr/map','_blank')</script>", height=0)
 
@@ -364,14 +387,14 @@ with col2:
         st.components.v1.html("<script>window.open('https://www.howsmuch.com','_blank')</script>", height=0)
 
 with col3:
-    if "uploaded_pdf_path" in st.session_state:
-        with open(st.session_state["uploaded_pdf_path"], "rb") as f:
-            st.download_button(
-                label="🌐 브라우저 새 탭에서 PDF 열기",
-                data=f,
-                file_name="uploaded.pdf",
-                mime="application/pdf"
-            )
+    pdf_data = load_pdf_bytes(session_id, st.session_state["pdf_key"]) if st.session_state.get("pdf_key") else None
+    if pdf_data is not None:
+        st.download_button(
+            label="🌐 브라우저 새 탭에서 PDF 열기",
+            data=pdf_data,
+            file_name="uploaded.pdf",
+            mime="application/pdf"
+        )
     else:
         st.info("📄 먼저 PDF 파일을 업로드해 주세요.")
 
@@ -384,10 +407,10 @@ st.subheader("📌 LTV 비율 입력")
 ltv_col1, ltv_col2 = st.columns(2)
 
 with ltv_col1:
-    raw_ltv1 = st.text_input("LTV 비율 ① (%)", "80")
+    raw_ltv1 = st.text_input("LTV 비율 ① (%)", "80", key="ltv1")
 
 with ltv_col2:
-    raw_ltv2 = st.text_input("LTV 비율 ② (%)", "")
+    raw_ltv2 = st.text_input("LTV 비율 ② (%)", "", key="ltv2")
 
 # 선택값 정리
 ltv_selected = []
@@ -404,9 +427,6 @@ ltv_selected = list(dict.fromkeys(ltv_selected))  # 중복 제거
 # 🔹 대출 항목 입력
 # ------------------------------
 
-rows = st.number_input("대출 항목", min_value=0, max_value=10, value=3)
-items = []
-
 def format_with_comma(key):
     raw = st.session_state.get(key, "")
     clean = re.sub(r"[^\d]", "", raw)
@@ -415,103 +435,78 @@ def format_with_comma(key):
     else:
         st.session_state[key] = ""
 
-for i in range(rows):
-    cols = st.columns(5)
+def render_loan_grid():
+    if "loan_rows" not in st.session_state:
+        st.session_state["loan_rows"] = 3
+    rows = st.number_input("대출 항목", min_value=0, max_value=10, key="loan_rows")
+    items = []
 
-    lender = cols[0].text_input("설정자", key=f"lender_{i}")
+    for i in range(rows):
+        cols = st.columns(5)
 
-    maxamt_key = f"maxamt_{i}"
-    ratio_key = f"ratio_{i}"
-    principal_key = f"principal_{i}"
-    manual_flag_key = f"manual_{principal_key}"
+        lender = cols[0].text_input("설정자", key=f"lender_{i}")
 
-    # 채권최고액 & 비율 입력
-    max_amt = cols[1].text_input("채권최고액 (만)", key=maxamt_key, on_change=format_with_comma, args=(maxamt_key,))
-    ratio = cols[2].text_input("설정비율 (%)", value="120", key=ratio_key)
-
-    # 계산
-    try:
-        max_amt_val = int(re.sub(r"[^\d]", "", st.session_state.get(maxamt_key, "0")))
-        ratio_val = int(re.sub(r"[^\d]", "", st.session_state.get(ratio_key, "120")))
-        auto_calc = max_amt_val * 100 // ratio_val
-    except:
-        auto_calc = 0
-
-    # 자동계산 상태 유지
-    if manual_flag_key not in st.session_state:
-        st.session_state[manual_flag_key] = False
-
-    # 입력 변동 → 자동계산 되도록 재설정
-    # 원금 필드가 수기입력 상태가 아니면 계산값으로 덮어쓰기
-    if not st.session_state[manual_flag_key]:
-        st.session_state[principal_key] = f"{auto_calc:,}"
-
-    # 원금 필드 입력 시 → 수기입력으로 전환 + 포맷
-    def on_manual_input(principal_key=principal_key, manual_flag_key=manual_flag_key):
-        st.session_state[manual_flag_key] = True
-        format_with_comma(principal_key)
-
-    # 원금 입력 필드
-    cols[3].text_input(
-        "원금",
-        key=principal_key,
-        value=st.session_state.get(principal_key, ""),
-        on_change=on_manual_input,
-    )
+        maxamt_key = f"maxamt_{i}"
+        ratio_key = f"ratio_{i}"
+        principal_key = f"principal_{i}"
+        manual_flag_key = f"manual_{principal_key}"
 
-    # 진행 구분
-    status = cols[4].selectbox("진행구분", ["유지", "대환", "선말소"], key=f"status_{i}")
+        # 채권최고액 & 비율 입력
+        max_amt = cols[1].text_input("채권최고액 (만)", key=maxamt_key, on_change=format_with_comma, args=(maxamt_key,))
+        ratio = cols[2].text_input("설정비율 (%)", value="120", key=ratio_key)
 
-    items.append({
-        "설정자": lender,
-        "채권최고액": st.session_state.get(maxamt_key, ""),
-        "설정비율": ratio,
-        "원금": st.session_state.get(principal_key, ""),
-        "진행구분": status
-    })
+        # 계산
+        try:
+            max_amt_val = int(re.sub(r"[^\d]", "", st.session_state.get(maxamt_key, "0")))
+            ratio_val = int(re.sub(r"[^\d]", "", st.session_state.get(ratio_key, "120")))
+            auto_calc = max_amt_val * 100 // ratio_val
+        except:
+            auto_calc = 0
+
+        # 자동계산 상태 유지
+        if manual_flag_key not in st.session_state:
+            st.session_state[manual_flag_key] = False
+
+        # 입력 변동 → 자동계산 되도록 재설정
+        # 원금 필드가 수기입력 상태가 아니면 계산값으로 덮어쓰기
+        if not st.session_state[manual_flag_key]:
+            st.session_state[principal_key] = f"{auto_calc:,}"
+
+        # 원금 필드 입력 시 → 수기입력으로 전환 + 포맷
+        def on_manual_input(principal_key=principal_key, manual_flag_key=manual_flag_key):
+            st.session_state[manual_flag_key] = True
+            format_with_comma(principal_key)
+
+        # 원금 입력 필드
+        cols[3].text_input(
+            "원금",
+            key=principal_key,
+            value=st.session_state.get(principal_key, ""),
+            on_change=on_manual_input,
+        )
+
+        # 진행 구분
+        status = cols[4].selectbox("진행구분", ["유지", "대환", "선말소"], key=f"status_{i}")
+
+        items.append({
+            "설정자": lender,
+            "채권최고액": st.session_state.get(maxamt_key, ""),
+            "설정비율": ratio,
+            "원금": st.session_state.get(principal_key, ""),
+            "진행구분": status
+        })
+
+    # ✅ 저장 시 사용 (history_manager.save_user_input → loan_schema.encode_loans)
+    st.session_state["대출항목"] = items
+    return items
 
 
 # ------------------------------
-# 🔹 LTV 계산부
+# 🔹 결과 출력
 # ------------------------------
 
-total_value = parse_korean_number(raw_price_input)
-
-# ✅ 항상 초기화: 이후 오류 방지
-limit_senior_dict = {}
-limit_sub_dict = {}
-valid_items = []
-
-# ✅ 항상 초기화 (rows == 0 에도 필요)
-sum_dh = 0
-sum_sm = 0
-sum_maintain = 0
-sum_sub_principal = 0
-
-if int(rows) == 0:
-    st.markdown("### 📌 대출 항목이 없으므로 선순위 최대 LTV만 계산합니다")
-    for ltv in ltv_selected:
-        limit = int(total_value * (ltv / 100) - deduction)
-        limit = (limit // 10) * 10
-        limit_senior_dict[ltv] = (limit, limit)
-else:
-    # 진행구분별 합계 계산
-    sum_dh = sum(
-        int(re.sub(r"[^\d]", "", item.get("원금", "0")) or 0)
-        for item in items if item.get("진행구분") == "대환"
-    )
-    sum_sm = sum(
-        int(re.sub(r"[^\d]", "", item.get("원금", "0")) or 0)
-        for item in items if item.get("진행구분") == "선말소"
-    )
-    sum_maintain = sum(
-        int(re.sub(r"[^\d]", "", item.get("채권최고액", "0")) or 0)
-        for item in items if item.get("진행구분") == "유지"
-    )
-    sum_sub_principal = sum(
-        int(re.sub(r"[^\d]", "", item.get("원금", "0")) or 0)
-        for item in items if item.get("진행구분") not in ["유지"]
-    )
+def build_result_text(customer_name, address_input, floor_num, raw_price_input, area_input, deduction, items, ltv_selected):
+    total_value = parse_korean_number(raw_price_input)
 
     # 유효 항목만 필터링
     valid_items = [item for item in items if any([
@@ -520,71 +515,71 @@ else:
         re.sub(r"[^\d]", "", item.get("원금", "") or "0") != "0"
     ])]
 
+    # 진행구분별 합계 + LTV 계산 (ltv_calc 공용 로직, 리포트와 동일)
+    loans = decode_loans(items)
+    sums = loan_sums(loans)
+    sum_dh = sums["대환"]
+    sum_sm = sums["선말소"]
+    limit_senior_dict, limit_sub_dict = compute_limits(total_value, deduction, loans, ltv_selected)
 
-    # ✅ LTV 계산 함수
-    def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
-        if is_senior:
-            limit = int(total_value * (ltv / 100) - deduction)
-            available = int(limit - principal_sum)
-        else:
-            limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
-            available = int(limit - principal_sum)
-        limit = (limit // 10) * 10
-        available = (available // 10) * 10
-        return limit, available
-
-    for ltv in ltv_selected:
-        if sum_maintain > 0:
-            limit_sub_dict[ltv] = calculate_ltv(total_value, deduction, sum_sub_principal, sum_maintain, ltv, is_senior=False)
-        else:
-            limit_senior_dict[ltv] = calculate_ltv(total_value, deduction, sum_dh + sum_sm, 0, ltv, is_senior=True)
-
+    type_of_price = price_type_for_floor(floor_num)
+    lines = [
+        f"고객명 : {customer_name}",
+        f"주소 : {address_input}",
+        f"{type_of_price} | KB시세: {raw_price_input} | 전용면적 : {area_input} | 방공제 금액 : {deduction:,}만",
+    ]
 
-# ------------------------------
-# 🔹 결과 출력
-# ------------------------------
+    if valid_items:
+        lines += ["", "대출 항목"]
+        for item in valid_items:
+            raw_max = re.sub(r"[^\d]", "", item.get("채권최고액", "0"))
+            max_amt = int(raw_max) if raw_max else 0
 
-text_to_copy = f"고객명 : {customer_name}\n주소 : {address_input}\n"
-type_of_price = "하안가" if floor_num and floor_num <= 2 else "일반가"
-text_to_copy += f"{type_of_price} | KB시세: {raw_price_input} | 전용면적 : {area_input} | 방공제 금액 : {deduction:,}만\n"
+            raw_principal = re.sub(r"[^\d]", "", item.get("원금", "0"))
+            principal_amt = int(raw_principal) if raw_principal else 0
 
-if valid_items:
-    text_to_copy += "\n대출 항목\n"
-    for item in valid_items:
-        raw_max = re.sub(r"[^\d]", "", item.get("채권최고액", "0"))
-        max_amt = int(raw_max) if raw_max else 0
+            lines.append(f"{item.get('설정자', '')} | 채권최고액: {max_amt:,} | 비율: {item.get('설정비율', '0')}% | 원금: {principal_amt:,} | {item.get('진행구분', '')}")
+    lines.append("")
 
-        raw_principal = re.sub(r"[^\d]", "", item.get("원금", "0"))
-        principal_amt = int(raw_principal) if raw_principal else 0
+    for ltv in ltv_selected:
+        if ltv in limit_senior_dict:
+            limit, avail = limit_senior_dict[ltv]
+            lines.append(f"선순위 LTV {ltv}% {limit:,} 가용 {avail:,}")
+        if ltv in limit_sub_dict:
+            limit, avail = limit_sub_dict[ltv]
+            lines.append(f"후순위 LTV {ltv}% {limit:,} 가용 {avail:,}")
 
-        text_to_copy += f"{item.get('설정자', '')} | 채권최고액: {max_amt:,} | 비율: {item.get('설정비율', '0')}% | 원금: {principal_amt:,} | {item.get('진행구분', '')}\n"
+    # ✅ 항상 안전하게 동작
+    lines.append("진행구분별 원금 합계")
+    if sum_dh > 0:
+        lines.append(f"대환: {sum_dh:,}만")
+    if sum_sm > 0:
+        lines.append(f"선말소: {sum_sm:,}만")
 
+    return "\n".join(lines) + "\n"
 
-for ltv in ltv_selected:
-    if ltv in limit_senior_dict:
-        limit, avail = limit_senior_dict[ltv]
-        text_to_copy += f"\n선순위 LTV {ltv}% {limit:,} 가용 {avail:,}"
-    if ltv in limit_sub_dict:
-        limit, avail = limit_sub_dict[ltv]
-        text_to_copy += f"\n후순위 LTV {ltv}% {limit:,} 가용 {avail:,}"
 
+# ✅ 대출 항목 + 결과 (fragment: 대출 입력 시 이 영역만 재실행, 위쪽 입력은 인자로 전달)
+@st.fragment
+def render_loan_section(customer_name, address_input, floor_num, raw_price_input, area_input, deduction, ltv_selected):
+    with timed_section("loans"):
+        items = render_loan_grid()
 
-# ✅ 항상 안전하게 동작
-text_to_copy += "\n진행구분별 원금 합계\n"
-if sum_dh > 0:
-    text_to_copy += f"대환: {sum_dh:,}만\n"
-if sum_sm > 0:
-    text_to_copy += f"선말소: {sum_sm:,}만\n"
+    with timed_section("result"):
+        if not items:
+            st.markdown("### 📌 대출 항목이 없으므로 선순위 최대 LTV만 계산합니다")
+        text_to_copy = build_result_text(
+            customer_name, address_input, floor_num, raw_price_input, area_input, deduction, items, ltv_selected
+        )
+        st.text_area("결과 내용", value=text_to_copy, height=320)
 
-st.text_area("결과 내용", value=text_to_copy, height=320)
+render_loan_section(customer_name, address_input, floor_num, raw_price_input, area_input, deduction, ltv_selected)
 
 
 # ------------------------------
 # 🔹 수수료 계산부
 # ------------------------------
 
-import re
-
 def format_with_commas(value):
     try:
         return f"{int(value):,}"
@@ -597,34 +592,45 @@ def parse_comma_number(text):
     except:
         return 0
 
-col1, col2, col3, col4 = st.columns(4)
+# ✅ 수수료 계산기 (fragment: 다른 입력과 독립적으로 재실행)
+@st.fragment
+def render_fee_calculator():
+    with timed_section("fees"):
+        col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    consult_input = st.text_input("컨설팅 금액 (만원)", "", key="consult_amt")
-    consult_amount = parse_comma_number(consult_input)
+        with col1:
+            consult_input = st.text_input("컨설팅 금액 (만원)", "", key="consult_amt")
+            consult_amount = parse_comma_number(consult_input)
 
-with col2:
-    consult_rate = st.number_input("컨설팅 수수료율 (%)", min_value=0.0, value=1.5, step=0.1, format="%.1f")
+        with col2:
+            consult_rate = st.number_input("컨설팅 수수료율 (%)", min_value=0.0, value=1.5, step=0.1, format="%.1f")
 
-with col3:
-    bridge_input = st.text_input("브릿지 금액 (만원)", "", key="bridge_amt")
-    bridge_amount = parse_comma_number(bridge_input)
+        with col3:
+            bridge_input = st.text_input("브릿지 금액 (만원)", "", key="bridge_amt")
+            bridge_amount = parse_comma_number(bridge_input)
 
-with col4:
-    bridge_rate = st.number_input("브릿지 수수료율 (%)", min_value=0.0, value=0.7, step=0.1, format="%.1f")
+        with col4:
+            bridge_rate = st.number_input("브릿지 수수료율 (%)", min_value=0.0, value=0.7, step=0.1, format="%.1f")
+
+        # 수수료 계산
+        consult_fee = int(consult_amount * consult_rate / 100)
+        bridge_fee = int(bridge_amount * bridge_rate / 100)
+        total_fee = consult_fee + bridge_fee
 
-# 수수료 계산
-consult_fee = int(consult_amount * consult_rate / 100)
-bridge_fee = int(bridge_amount * bridge_rate / 100)
-total_fee = consult_fee + bridge_fee
+        # 저장 시 사용
+        st.session_state["consult_fee"] = consult_fee
+        st.session_state["bridge_fee"] = bridge_fee
+        st.session_state["total_fee"] = total_fee
 
-# 출력
-st.markdown(f"""
+        # 출력
+        st.markdown(f"""
 #### 수수료 합계: **{total_fee:,}만원**
 - 컨설팅 수수료: {consult_fee:,}만원
 - 브릿지 수수료: {bridge_fee:,}만원
 """)
 
+render_fee_calculator()
+
 
 st.markdown("---")
 st.markdown("### 💾 수동 저장")
@@ -639,3 +645,8 @@ if cur_name and cur_addr:
         st.success("✅ 현재 입력 정보를 저장했습니다.")
 else:
     st.warning("⚠️ 고객명과 주소를 모두 입력해야 저장할 수 있습니다.")
+
+# ✅ 재실행 통계 (전체 스크립트 vs fragment 구간)
+record("script", (time.perf_counter() - script_started) * 1000)
+with st.sidebar.expander("⏱ 재실행 통계"):
+    st.dataframe(pd.DataFrame(stats_rows()), hide_index=True)
@@ -0,0 +1,71 @@
+# bench_pdf_extract.py
+# 페이지 수별 순차 / 병렬 텍스트 추출 속도 비교
+#   python bench_pdf_extract.py              → 기본 페이지 수 목록
+#   python bench_pdf_extract.py 50 200 800   → 지정한 페이지 수만
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+from pdf_utils import MAX_WORKERS, PARALLEL_PAGE_THRESHOLD, extract_pages, process_pdf
+
+DEFAULT_PAGE_COUNTS = [10, 50, 100, 200, 400, 800]
+REPEAT = 3
+CROSSOVER_SPEEDUP = 1.1  # 이 배율 이상 빨라져야 병렬 전환 가치가 있다고 봄
+
+
+def make_registry_pdf(pages):
+    # 집합건물 등기부 형태의 합성 PDF (한글 CJK 내장 폰트 사용)
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        y = 60
+        lines = [f"[집합건물] 서울특별시 강남구 역삼동 123-{p} 제{p % 20 + 1}층 제{p + 1}01호"]
+        lines += [f"{i}. 근저당권설정 2023년{i % 12 + 1}월 채권최고액 금{(i + 1) * 1200}만원 전유부분 84.{p % 100:02d}㎡"
+                  for i in range(40)]
+        if p == pages - 1:
+            lines += ["주요 등기사항 요약", "홍길동 (공유자)", "800101-*******", "김철수 (공유자)", "820202-*******"]
+        for line in lines:
+            page.insert_text((40, y), line, fontname="korea", fontsize=9)
+            y += 16
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def best_of(fn):
+    best = None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(page_counts):
+    print(f"workers={MAX_WORKERS}  auto threshold={PARALLEL_PAGE_THRESHOLD} pages  best of {REPEAT}")
+    # 프로세스 풀 예열 (첫 spawn 비용은 서버 수명 동안 한 번만 발생)
+    extract_pages(make_registry_pdf(MAX_WORKERS), parallel=True)
+
+    print(f"{'pages':>6} {'sequential':>11} {'parallel':>10} {'speedup':>8} {'auto':>9}")
+    crossover = None
+    for pages in page_counts:
+        data = make_registry_pdf(pages)
+        seq = best_of(lambda: process_pdf(data, parallel=False))
+        par = best_of(lambda: process_pdf(data, parallel=True))
+        assert process_pdf(data, parallel=False) == process_pdf(data, parallel=True)
+        auto = "parallel" if pages >= PARALLEL_PAGE_THRESHOLD and MAX_WORKERS > 1 else "seq"
+        print(f"{pages:>6} {seq * 1000:>9.1f}ms {par * 1000:>8.1f}ms {seq / par:>7.2f}x {auto:>9}")
+        if crossover is None and seq / par >= CROSSOVER_SPEEDUP:
+            crossover = pages
+
+    # 병렬이 CROSSOVER_SPEEDUP 배 이상 빨라지는 첫 페이지 수 → LTV_PARALLEL_PAGE_THRESHOLD 권장값
+    if crossover is None:
+        print(f"교차 지점 없음: 측정 범위에서 병렬이 {CROSSOVER_SPEEDUP}x 이상 빠른 구간이 없음 (순차 처리 유지)")
+    else:
+        print(f"교차 지점: {crossover} pages → LTV_PARALLEL_PAGE_THRESHOLD={crossover}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or DEFAULT_PAGE_COUNTS)
@@ -0,0 +1,82 @@
+# bench_reruns.py
+# Streamlit AppTest 로 상호작용별 전체 스크립트 재실행 wall 시간 측정
+#   python bench_reruns.py                          → 이 작업 트리의 app.py
+#   python bench_reruns.py --app /tmp/ltv-base/app.py --repeat 10
+#
+# ⚠️ AppTest 는 fragment 를 지원하지 않아 위젯을 바꿀 때마다 항상 스크립트 전체를 다시 실행한다.
+# 그래서 이 측정으로는 "fragment 안의 상호작용이 그 fragment 만 재실행된다"는 효과를 볼 수 없고,
+# 얻을 수 있는 값은 상호작용 한 번에 드는 전체 재실행 wall 시간뿐이다.
+# fragment 도입 전후 비교는 같은 명령을 두 트리에서 각각 돌려 wall 시간을 나란히 놓는다.
+#   git worktree add /tmp/ltv-base <fragment 도입 전 커밋>
+#   python bench_reruns.py --app /tmp/ltv-base/app.py
+#   python bench_reruns.py
+# 실제 서버에서 구간별 재실행 횟수는 `streamlit run app.py` 의 사이드바 "재실행 통계" 로 확인한다.
+# 앱 모듈끼리 섞이지 않도록 트리 하나당 프로세스 하나로 실행한다.
+#
+# 측정 결과 (--repeat 30, NOTION_BACKEND=local, 같은 머신에서 두 트리를 번갈아 두 번씩, median / min ms)
+#   상호작용 한 번 = 두 트리 모두 전체 스크립트 재실행 1회 (AppTest 한계)
+#                          c5c5bf7 (fragment 도입 전)     HEAD (fragment + 이후 변경)
+#   최초 실행                 841.7 / 838.1 (median)        823.2 / 1277.4 (median)
+#   재실행 (입력 변화 없음)     51.6 / 48.1,  80.7 / 50.2     60.5 / 57.5,  64.4 / 58.3
+#   채권최고액 입력            51.3 / 49.0,  85.7 / 69.0     99.2 / 58.6, 102.2 / 60.5
+#   진행구분 변경              63.3 / 47.9,  57.6 / 49.5    102.3 / 70.3, 104.1 / 98.5
+#   컨설팅 금액 입력           50.8 / 48.1,  52.6 / 49.0    104.5 / 90.1, 104.9 / 99.7
+#   KB 시세 입력               53.0 / 49.9,  86.3 / 53.8     73.5 / 56.6, 106.9 / 102.8
+# 전체 재실행 기준으로는 HEAD 가 상호작용당 10~50ms 느리다 (fragment 함수 정의 / 재실행 통계 /
+# 문서 저장소 조회가 매 전체 재실행에 더해짐). fragment 안 상호작용이 fragment 만 재실행해서
+# 얻는 이득은 이 측정에 나타나지 않으며, 실제 서버의 "재실행 통계"로만 확인할 수 있다.
+# 머신 부하에 따른 편차가 커서(같은 트리 안에서도 median 이 30ms 넘게 흔들림) 한 자릿수 ms 차이는 의미가 없다.
+import os
+import sys
+import time
+import argparse
+import statistics
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (이름, 상호작용) — 두 트리의 app.py 에 모두 있는 위젯 키만 사용
+INTERACTIONS = [
+    ("재실행 (입력 변화 없음)", lambda at, i: at.run()),
+    ("채권최고액 입력", lambda at, i: at.text_input(key="maxamt_0").input(f"{12000 + i * 10:,}").run()),
+    ("진행구분 변경", lambda at, i: at.selectbox(key="status_0").select("대환" if i % 2 == 0 else "유지").run()),
+    ("컨설팅 금액 입력", lambda at, i: at.text_input(key="consult_amt").input(f"{30000 + i * 10}").run()),
+    ("KB 시세 입력", lambda at, i: at.text_input(key="raw_price_input").input(f"{85000 + i * 10}").run()),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상호작용별 전체 재실행 wall 시간 (AppTest)")
+    parser.add_argument("--app", default=os.path.join(APP_DIR, "app.py"), help="측정할 app.py 경로")
+    parser.add_argument("--repeat", type=int, default=5, help="상호작용별 반복 횟수")
+    args = parser.parse_args()
+
+    app_file = os.path.abspath(args.app)
+    app_dir = os.path.dirname(app_file)
+    # 측정 대상 트리의 모듈 / 데이터 파일을 쓰도록 해당 폴더 기준으로 실행
+    sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_file, default_timeout=60)
+    t0 = time.perf_counter()
+    at.run()
+    first = (time.perf_counter() - t0) * 1000
+    assert not at.exception, at.exception
+
+    print(f"app={app_file}  repeat={args.repeat}")
+    print("※ AppTest 는 항상 스크립트 전체를 재실행하므로 아래 값은 전체 재실행 wall 시간이다 (fragment 효과 미포함)")
+    print(f"{'최초 실행':<22} {first:8.1f}ms")
+    print(f"{'상호작용':<22} {'median':>9} {'min':>9} {'max':>9}")
+    for label, action in INTERACTIONS:
+        samples = []
+        for i in range(args.repeat):
+            t0 = time.perf_counter()
+            action(at, i)
+            samples.append((time.perf_counter() - t0) * 1000)
+            assert not at.exception, at.exception
+        print(f"{label:<22} {statistics.median(samples):7.1f}ms {min(samples):7.1f}ms {max(samples):7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
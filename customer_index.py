@@ -0,0 +1,126 @@
+import re
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+# ─────────────────────────────
+# 🔎 고객명 검색 인덱스 (서버 측 페이지 단위 조회)
+# ─────────────────────────────
+# - 최근 저장순 정렬 배열: 검색어가 없을 때 최근 고객부터 페이지 단위로 반환
+# - 글자 2-gram 역색인: 검색어가 포함된 고객 후보만 빠르게 추림
+# - 조회 결과 LRU 캐시: 저장 / 삭제 시 인덱스를 부분 갱신하고 캐시를 비움
+
+QUERY_CACHE_SIZE = 256
+
+
+def _grams(text):
+    if len(text) < 2:
+        return set(text)
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class CustomerIndex:
+    def __init__(self, customers=None):
+        self._lock = threading.RLock()
+        self._last_saved = {}    # 고객명 -> 마지막 저장일시
+        self._sort_keys = {}     # 고객명 -> 최근순 정렬키
+        self._by_recency = []    # 정렬키 배열 — 최근 저장이 앞
+        self._postings = {}      # 2-gram / 1글자 -> 고객명 집합
+        self._cache = OrderedDict()
+        for name, ts in (customers or {}).items():
+            self._add(name, ts, keep_sorted=False)
+        self._by_recency.sort()
+
+    def __len__(self):
+        return len(self._last_saved)
+
+    @staticmethod
+    def _recency_key(name, ts):
+        # 저장일시("YYYY-MM-DD HH:MM:SS") 내림차순, 같으면 이름순
+        digits = re.sub(r"\D", "", ts or "")
+        return (-int(digits) if digits else 0, name)
+
+    def _add(self, name, ts, keep_sorted=True):
+        key = self._recency_key(name, ts)
+        self._last_saved[name] = ts
+        self._sort_keys[name] = key
+        if keep_sorted:
+            insort(self._by_recency, key)
+        else:
+            self._by_recency.append(key)
+        for g in _grams(name) | set(name):
+            self._postings.setdefault(g, set()).add(name)
+
+    def _remove(self, name):
+        if self._last_saved.pop(name, None) is None:
+            return
+        key = self._sort_keys.pop(name)
+        pos = bisect_left(self._by_recency, key)
+        if pos < len(self._by_recency) and self._by_recency[pos] == key:
+            del self._by_recency[pos]
+        for g in _grams(name) | set(name):
+            names = self._postings.get(g)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._postings[g]
+
+    # ------------------------------
+    # 🔹 갱신 (저장 / 삭제)
+    # ------------------------------
+
+    def upsert(self, name, ts):
+        with self._lock:
+            self._remove(name)
+            self._add(name, ts)
+            self._cache.clear()
+
+    def remove(self, name):
+        with self._lock:
+            self._remove(name)
+            self._cache.clear()
+
+    # ------------------------------
+    # 🔹 조회
+    # ------------------------------
+
+    def _matches(self, query, limit):
+        grams = _grams(query)
+        candidates = None
+        for g in sorted(grams, key=lambda g: len(self._postings.get(g, ()))):
+            names = self._postings.get(g)
+            if not names:
+                return [], 0
+            candidates = set(names) if candidates is None else candidates & names
+            if not candidates:
+                return [], 0
+        matches = [n for n in candidates if query in n]
+        # 관련도: 정확히 일치 > 앞부분 일치 > 포함, 같은 등급은 최근 저장순 (요청 페이지까지만 정렬)
+        top = heapq.nsmallest(limit, matches, key=lambda n: (
+            0 if n == query else 1 if n.startswith(query) else 2,
+            self._sort_keys[n],
+        ))
+        return top, len(matches)
+
+    def search(self, query="", page=0, page_size=20):
+        query = (query or "").strip()
+        cache_key = (query, page, page_size)
+        with self._lock:
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                return self._cache[cache_key]
+
+            start = page * page_size
+            if query:
+                top, total = self._matches(query, start + page_size)
+                names = top[start:]
+            else:
+                total = len(self._by_recency)
+                names = [name for _, name in self._by_recency[start:start + page_size]]
+
+            result = (names, total)
+            self._cache[cache_key] = result
+            if len(self._cache) > QUERY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return result
@@ -1,19 +1,63 @@
 
 import os
+import tempfile
+import threading
 import pandas as pd
 import streamlit as st
 from datetime import datetime
+from ltv_map import region_map
 from notion_utils import create_customer_record, delete_customer_from_notion
+from loan_schema import encode_loans, decode_loans, parse_loans
+from version_store import VersionStore
+from customer_index import CustomerIndex
 
 HISTORY_FILE = "ltv_input_history.csv"
 ARCHIVE_FILE = "ltv_archive_deleted.xlsx"
+VERSIONS_FILE = "ltv_history_versions.jsonl"
+MAX_LOAN_ROWS = 10
+CUSTOMER_PAGE_SIZE = 20
 
-def get_customer_options():
-    if not os.path.exists(HISTORY_FILE):
-        return []
-    df = pd.read_csv(HISTORY_FILE)
-    return df["고객명"].unique().tolist()
+_version_store = None
+_customer_index = None
+_init_lock = threading.Lock()
+_archive_lock = threading.Lock()
 
+# ✅ 고객별 버전 이력 저장소 = 현재 상태의 원본 (고객별 최신 버전)
+# 처음 사용 시 기존 CSV 기록을 snapshot 으로 옮겨 옴. 이후 CSV 는 읽기만 하고 더 이상 쓰지 않는다.
+def get_version_store():
+    global _version_store
+    with _init_lock:
+        if _version_store is None:
+            store = VersionStore(VERSIONS_FILE)
+            if store.is_empty() and os.path.exists(HISTORY_FILE):
+                df = pd.read_csv(HISTORY_FILE, dtype=str).fillna("")
+                for record in df.to_dict("records"):
+                    if record.get("고객명"):
+                        ts = record.get("저장일시") or record.get("날짜") or ""
+                        # 예전 repr 형식 대출항목은 JSON 스키마로 바꿔서 옮김 (추가 전용이라 나중에 고칠 수 없음)
+                        # 해석할 수 없는 값은 잃지 않도록 원래 문자열 그대로 둔다
+                        try:
+                            record["대출항목"] = encode_loans(parse_loans(record.get("대출항목", "")))
+                        except ValueError:
+                            pass
+                        store.append(record["고객명"], ts, record)
+            _version_store = store
+    return _version_store
+
+# ✅ 고객명 검색 인덱스 (프로세스당 한 번 구성, 저장 / 삭제 시 부분 갱신)
+def get_customer_index():
+    global _customer_index
+    store = get_version_store()
+    with _init_lock:
+        if _customer_index is None:
+            _customer_index = CustomerIndex(store.customers())
+    return _customer_index
+
+# 검색어와 관련도 / 최근 저장순으로 한 페이지만 반환 → (고객명 목록, 전체 건수)
+def search_customer_page(query="", page=0, page_size=CUSTOMER_PAGE_SIZE):
+    return get_customer_index().search(query, page, page_size)
+
+# overwrite 는 예전 호출부 호환용 (버전 이력에는 항상 새 버전이 추가되고, 최신 버전이 현재 상태)
 def save_user_input(overwrite=False):
     if "customer_name" not in st.session_state or not st.session_state["customer_name"]:
         return
@@ -26,7 +70,9 @@ def save_user_input(overwrite=False):
         "면적": st.session_state.get("area_input", ""),
         "공동소유자": st.session_state.get("co_owners", ""),
         "방공제": st.session_state.get("deduction_input", ""),
-        "대출항목": st.session_state.get("대출항목", ""),
+        "대출항목": encode_loans(
+            loan for loan in decode_loans(st.session_state.get("대출항목", [])) if not loan.is_empty()
+        ),
         "수수료": st.session_state.get("total_fee", ""),
         "컨설팅수수료": st.session_state.get("consult_fee", ""),
         "브릿지수수료": st.session_state.get("bridge_fee", ""),
@@ -35,15 +81,10 @@ def save_user_input(overwrite=False):
         "저장일시": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     }
 
-    df_new = pd.DataFrame([user_data])
-    if os.path.exists(HISTORY_FILE):
-        df = pd.read_csv(HISTORY_FILE)
-        if overwrite:
-            df = df[df["고객명"] != name]
-        df = pd.concat([df, df_new], ignore_index=True)
-    else:
-        df = df_new
-    df.to_csv(HISTORY_FILE, index=False)
+    # ✅ 버전 이력에 한 줄 추가 (이전 버전은 지우지 않음, 전체 파일 재작성 없음)
+    get_version_store().append(name, user_data["저장일시"], user_data)
+    if _customer_index is not None:
+        _customer_index.upsert(name, user_data["저장일시"])
 
     # ✅ 저장 시 Notion에도 기록 (deleted_at 제거)
     create_customer_record(
@@ -51,58 +92,98 @@ def save_user_input(overwrite=False):
         address=user_data["주소"],
         region=user_data["지역"],
         memo=user_data["메모"],
-        loans=str(user_data["대출항목"]),
+        loans=user_data["대출항목"],
         kb_price=user_data["KB시세"],
         area=user_data["면적"],
         co_owners=user_data["공동소유자"]
     )
 
-def load_customer_input(name):
-    if not os.path.exists(HISTORY_FILE):
-        return
-    df = pd.read_csv(HISTORY_FILE)
-    df_matched = df[df["고객명"] == name]
-    if df_matched.empty:
+# as_of: "YYYY-MM-DD HH:MM:SS" — 그 시점 이전의 마지막 저장 상태를 불러옴 (None 이면 최신)
+def load_customer_input(name, as_of=None):
+    record = get_version_store().get(name, as_of)
+    if record is None:
         st.warning(f"⚠️ '{name}'에 해당하는 저장기록이 없습니다.")
         return
-    record = df_matched.iloc[-1].to_dict()
     st.session_state["customer_name"] = record.get("고객명", "")
     st.session_state["address_input"] = record.get("주소", "")
-    st.session_state["region"] = record.get("지역", "")
+    st.session_state["region"] = record.get("지역", "") if record.get("지역", "") in region_map else ""
     st.session_state["raw_price_input"] = record.get("KB시세", "")
     st.session_state["area_input"] = record.get("면적", "")
     st.session_state["co_owners"] = record.get("공동소유자", "")
     st.session_state["deduction_input"] = record.get("방공제", "")
-    st.session_state["대출항목"] = eval(record.get("대출항목", "[]"))
+    loans = decode_loans(record.get("대출항목"))
+    st.session_state["대출항목"] = [loan.to_form() for loan in loans]
+    apply_loans_to_form(loans)
     st.session_state["total_fee"] = record.get("수수료", "")
     st.session_state["consult_fee"] = record.get("컨설팅수수료", "")
     st.session_state["bridge_fee"] = record.get("브릿지수수료", "")
     st.session_state["available_amount"] = record.get("가용자금", "")
     st.session_state["memo"] = record.get("메모", "")
 
-def cleanup_old_history(name_to_delete):
-    if not os.path.exists(HISTORY_FILE):
-        return
-    df = pd.read_csv(HISTORY_FILE)
-    deleted_df = df[df["고객명"] == name_to_delete]
-    df = df[df["고객명"] != name_to_delete]
-    df.to_csv(HISTORY_FILE, index=False)
-    if not deleted_df.empty:
-        deleted_df["삭제일시"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def list_customer_versions(name):
+    return get_version_store().list_versions(name)
+
+# ✅ 불러온 대출항목을 입력 위젯 상태에 반영 (위젯 생성 전에 호출되어야 함)
+def apply_loans_to_form(loans):
+    st.session_state["loan_rows"] = max(len(loans), 3)
+    for i in range(len(loans), MAX_LOAN_ROWS):
+        for prefix in ["lender_", "maxamt_", "ratio_", "principal_", "manual_principal_", "status_"]:
+            st.session_state.pop(f"{prefix}{i}", None)
+    for i, loan in enumerate(loans):
+        form = loan.to_form()
+        st.session_state[f"lender_{i}"] = form["설정자"]
+        st.session_state[f"maxamt_{i}"] = form["채권최고액"]
+        st.session_state[f"ratio_{i}"] = form["설정비율"]
+        st.session_state[f"principal_{i}"] = form["원금"]
+        st.session_state[f"manual_principal_{i}"] = True
+        st.session_state[f"status_{i}"] = form["진행구분"]
+
+# ✅ 삭제 고객 보관 파일: 프로세스 안에서는 잠금으로 직렬화, 임시 파일에 쓴 뒤 교체 (읽는 쪽은 항상 완전한 파일)
+def _append_to_archive(record):
+    with _archive_lock:
+        df_new = pd.DataFrame([record])
         if os.path.exists(ARCHIVE_FILE):
-            archive_df = pd.read_excel(ARCHIVE_FILE)
-            archive_df = pd.concat([archive_df, deleted_df], ignore_index=True)
+            df = pd.concat([pd.read_excel(ARCHIVE_FILE), df_new], ignore_index=True)
         else:
-            archive_df = deleted_df
-        archive_df.to_excel(ARCHIVE_FILE, index=False)
-        st.session_state["deleted_data_ready"] = True
-
-        # ✅ Notion에 삭제 기록도 반영
-        delete_customer_from_notion(name_to_delete)
-
-def search_customers_by_keyword(keyword):
-    if not os.path.exists(HISTORY_FILE):
-        return []
-    df = pd.read_csv(HISTORY_FILE)
-    matches = df[df["고객명"].str.contains(keyword, na=False)]["고객명"].unique().tolist()
-    return matches
+            df = df_new
+        fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(ARCHIVE_FILE)))
+        os.close(fd)
+        try:
+            df.to_excel(tmp_path, index=False)
+            os.replace(tmp_path, ARCHIVE_FILE)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+def cleanup_old_history(name_to_delete):
+    store = get_version_store()
+    last = store.get(name_to_delete)
+    if last is None:
+        return
+    deleted_at = datetime.now()
+    store.delete(name_to_delete, deleted_at.strftime("%Y-%m-%d %H:%M:%S"))
+    if _customer_index is not None:
+        _customer_index.remove(name_to_delete)
+
+    # 보관 파일에는 삭제 직전 상태 한 줄 (이전 버전은 버전 이력에 그대로 남아 있음)
+    _append_to_archive({**last, "삭제일시": deleted_at.strftime("%Y-%m-%d %H:%M:%S")})
+    st.session_state["deleted_data_ready"] = True
+
+    # ✅ Notion에 삭제 기록도 반영
+    delete_customer_from_notion(
+        name=name_to_delete,
+        address=str(last.get("주소", "")),
+        deleted_at=deleted_at.isoformat(),
+        region=str(last.get("지역", "")),
+        memo=str(last.get("메모", "")),
+    )
+
+def search_customers_by_keyword(keyword, limit=CUSTOMER_PAGE_SIZE):
+    return search_customer_page(keyword, 0, limit)[0]
+
+# ✅ 고객별 최신 기록을 한 명씩 스트리밍 (버전 이력 인덱스 기준, 삭제된 고객 제외)
+def count_latest_records():
+    return len(get_version_store().customers())
+
+def iter_latest_records():
+    yield from get_version_store().iter_latest()
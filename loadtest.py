@@ -0,0 +1,434 @@
+# loadtest.py
+# 동시 상담원 세션 부하 테스트 (실제 `streamlit run` 서버 + headless websocket 클라이언트 + 로컬 Notion 스텁)
+#   python loadtest.py --sessions 20 --iterations 3 --pages 12
+#
+# 앱 서버 프로세스 하나를 띄우고, 세션 수만큼 websocket(/_stcore/stream) 연결을 열어 브라우저와 같은
+# BackMsg(rerun_script + 위젯 상태)를 보낸다. 모든 세션이 한 서버 프로세스의 스크립트 스레드에서 돌기 때문에
+# GIL / 문서 저장소 잠금 / 이력 파일 경합이 그대로 측정된다.
+# PDF 는 브라우저와 같은 순서(file_urls_request → /_stcore/upload_file PUT → 위젯 상태)로 업로드하고,
+# fragment 안의 위젯은 브라우저처럼 그 fragment_id 로 재실행을 요청하므로 fragment 재실행도 따로 센다.
+# 세션마다: PDF 업로드 → 페이지 넘김 → 고객정보 / 대출 / LTV / 시세 입력 → 저장 → 검색 → 불러오기 → (마지막 반복) 삭제
+# 서버 작업 폴더를 임시 폴더로 두어 이력 / Notion 기록은 실제 데이터를 건드리지 않는다.
+# KB시세 자동조회는 임시 폴더의 stub 시세 CSV 를 쓴다.
+# 메모리 / CPU 는 서버 프로세스 전체 값이고, 세션당 값은 부하 구간의 서버 증가분을 세션 수로 나눈 추정치다.
+import os
+import csv
+import sys
+import time
+import socket
+import asyncio
+import shutil
+import argparse
+import tempfile
+import subprocess
+from collections import Counter, defaultdict
+
+import requests
+from websockets.asyncio.client import connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.Common_pb2 import FileUploaderState, UploadedFileInfo
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.runtime.state.common import user_key_from_element_id
+
+try:
+    import psutil
+except ImportError:  # psutil 이 없으면 Linux /proc 로 측정 (그 외 OS 는 "측정 불가")
+    psutil = None
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(APP_DIR, "app.py")
+SERVER_START_TIMEOUT_SEC = 60
+START_BARRIER_TIMEOUT_SEC = 300
+
+
+# ------------------------------
+# 🔹 서버 프로세스 측정 (psutil → Linux /proc → 측정 불가)
+# ------------------------------
+
+def process_rss(pid):
+    if psutil is not None:
+        return psutil.Process(pid).memory_info().rss
+    path = f"/proc/{pid}/statm"
+    if os.path.exists(path):
+        with open(path) as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    return None
+
+
+def process_cpu(pid):
+    if psutil is not None:
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    path = f"/proc/{pid}/stat"
+    if os.path.exists(path):
+        with open(path) as f:
+            fields = f.read().rsplit(")", 1)[1].split()  # utime, stime = 14, 15번째 필드
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return None
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def format_mb(n):
+    return "측정 불가" if n is None else f"{n / 1024 / 1024:.1f}MB"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ------------------------------
+# 🔹 브라우저 탭 1개를 흉내 내는 websocket 클라이언트
+# ------------------------------
+
+class SessionClient:
+    """위젯 상태를 들고 있다가 재실행 요청마다 전부 보내는 headless 클라이언트 (브라우저 프론트엔드와 같은 방식)"""
+
+    def __init__(self, ws, base_url):
+        self.ws = ws
+        self.base_url = base_url
+        self.session_id = ""
+        self.page_script_hash = ""
+        self.widgets = {}  # 위젯 key → (widget id, fragment id)
+        self.states = {}  # widget id → WidgetState
+        self.runs = Counter()  # "full" / "fragment"
+        self._request_id = 0
+
+    async def _receive(self):
+        msg = ForwardMsg()
+        msg.ParseFromString(await self.ws.recv())
+        if msg.WhichOneof("type") == "new_session":
+            self.page_script_hash = msg.new_session.page_script_hash
+            if msg.new_session.initialize.session_id:
+                self.session_id = msg.new_session.initialize.session_id
+        return msg
+
+    def _on_delta(self, delta, exceptions):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind is None:
+            return
+        proto = getattr(element, kind)
+        if kind == "exception":
+            exceptions.append(proto.message)
+        elif "id" in proto.DESCRIPTOR.fields_by_name and proto.id:
+            key = user_key_from_element_id(proto.id)
+            if key:
+                self.widgets[key] = (proto.id, delta.fragment_id)
+
+    async def rerun(self, fragment_id=""):
+        """재실행을 요청하고 script_finished 까지 기다림 → 화면에 나온 예외 메시지 목록"""
+        back = BackMsg()
+        back.rerun_script.page_script_hash = self.page_script_hash
+        back.rerun_script.widget_states.widgets.extend(self.states.values())
+        if fragment_id:
+            back.rerun_script.fragment_id = fragment_id
+        await self.ws.send(back.SerializeToString())
+        # 버튼 클릭(trigger)은 한 번만 보냄
+        self.states = {k: v for k, v in self.states.items() if v.WhichOneof("value") != "trigger_value"}
+
+        exceptions = []
+        while True:
+            msg = await self._receive()
+            kind = msg.WhichOneof("type")
+            if kind == "delta":
+                self._on_delta(msg.delta, exceptions)
+            elif kind == "script_finished":
+                status = msg.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:  # st.rerun() → 이어서 다시 실행됨
+                    continue
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    exceptions.append("스크립트 컴파일 오류")
+                self.runs["fragment" if status == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY else "full"] += 1
+                return exceptions
+
+    async def set_widget(self, key, **value):
+        widget_id, fragment_id = self.widgets[key]
+        self.states[widget_id] = WidgetState(id=widget_id, **value)
+        return await self.rerun(fragment_id)
+
+    async def text(self, key, value):
+        return await self.set_widget(key, string_value=value)
+
+    async def click(self, key):
+        return await self.set_widget(key, trigger_value=True)
+
+    async def upload(self, key, name, data):
+        self._request_id += 1
+        back = BackMsg()
+        back.file_urls_request.request_id = str(self._request_id)
+        back.file_urls_request.file_names.append(name)
+        back.file_urls_request.session_id = self.session_id
+        await self.ws.send(back.SerializeToString())
+        while True:
+            msg = await self._receive()
+            if msg.WhichOneof("type") == "file_urls_response":
+                break
+        if msg.file_urls_response.error_msg:
+            raise RuntimeError(msg.file_urls_response.error_msg)
+        urls = msg.file_urls_response.file_urls[0]
+        response = await asyncio.to_thread(
+            requests.put, self.base_url + urls.upload_url,
+            files={"file": (name, data, "application/pdf")}, timeout=60,
+        )
+        response.raise_for_status()
+        info = UploadedFileInfo(name=name, size=len(data), file_id=urls.file_id, file_urls=urls)
+        return await self.set_widget(key, file_uploader_state_value=FileUploaderState(uploaded_file_info=[info]))
+
+
+# ------------------------------
+# 🔹 세션 1개 시나리오
+# ------------------------------
+
+async def run_session(no, base_url, pdf_bytes, iterations, gate):
+    latencies = defaultdict(list)
+    errors = []
+    res = {"no": no, "latencies": latencies, "errors": errors, "runs": Counter()}
+    ws_url = base_url.replace("http://", "ws://") + "/_stcore/stream"
+    arrived = False
+    try:
+        async with connect(ws_url, subprotocols=["streamlit"], max_size=None, open_timeout=60) as ws:
+            client = SessionClient(ws, base_url)
+            errors += [f"first: {m}" for m in await client.rerun()]  # 브라우저 첫 접속과 같은 첫 실행
+            arrived = True
+            await gate.arrive()  # 모든 세션이 접속한 뒤 동시에 시작
+
+            async def step(name, action):
+                t0 = time.perf_counter()
+                try:
+                    errors.extend(f"{name}: {m}" for m in await action())
+                except KeyError as e:
+                    errors.append(f"{name}: 화면에 없는 위젯 {e}")
+                except Exception as e:
+                    errors.append(f"{name}: {e!r}")
+                latencies[name].append((time.perf_counter() - t0) * 1000)
+
+            await step("upload", lambda: client.upload("pdf_uploader", "registry.pdf", pdf_bytes))
+            if "page_next" not in client.widgets:
+                errors.append("upload: PDF 미리보기가 표시되지 않음")
+
+            for it in range(iterations):
+                name = f"부하{no:03d}_{it}"
+                address = f"서울특별시 강남구 역삼동 {no}-{it} 제{it + 3}층"
+                await step("page", lambda: client.click("page_next"))
+                await step("info", lambda: client.text("customer_name", name))
+                await step("info", lambda: client.text("address_input", address))
+                for i in range(3):
+                    await step("loan", lambda i=i: client.text(f"maxamt_{i}", f"{(i + 1) * 12000 + no}"))
+                await step("loan", lambda: client.text("status_1", "대환"))
+                await step("ltv", lambda: client.text("ltv1", "70"))
+                await step("ltv", lambda: client.text("ltv2", "80"))
+                await step("price", lambda: client.text("raw_price_input", f"{85000 + no * 10}"))
+                await step("save", lambda: client.click("manual_save_button"))
+                await step("search", lambda: client.text("customer_query", name))
+                await step("load", lambda: client.text("load_customer_select", name))
+                if it == iterations - 1:
+                    await step("delete", lambda: client.click("delete_customer_button"))
+            res["runs"] = client.runs
+    except Exception as e:
+        errors.append(f"session: {e!r}")
+    finally:
+        if not arrived:  # 첫 실행 전에 실패한 세션은 출발 인원에서 뺌
+            gate.leave()
+    res["latencies"] = dict(latencies)
+    return res
+
+
+class StartGate:
+    """모든 세션이 첫 실행을 마치면 동시에 출발 (먼저 실패한 세션은 인원에서 뺌)"""
+
+    def __init__(self, n, on_start):
+        self.waiting = n
+        self.on_start = on_start
+        self.event = asyncio.Event()
+
+    def leave(self):
+        self.waiting -= 1
+        if self.waiting <= 0 and not self.event.is_set():
+            self.on_start()
+            self.event.set()
+
+    async def arrive(self):
+        self.leave()
+        try:
+            await asyncio.wait_for(self.event.wait(), START_BARRIER_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def drive(args, base_url, server_pid, pdf_bytes):
+    marks = {}
+
+    def on_start():
+        marks["t0"] = time.perf_counter()
+        marks["cpu0"] = process_cpu(server_pid)
+        marks["rss0"] = process_rss(server_pid)
+        marks["client_cpu0"] = time.process_time()
+
+    gate = StartGate(args.sessions, on_start)
+    samples = []
+    stop = asyncio.Event()
+
+    async def sample_server():
+        while not stop.is_set():
+            rss = process_rss(server_pid)
+            if rss is not None:
+                samples.append(rss)
+            try:
+                await asyncio.wait_for(stop.wait(), 0.2)
+            except asyncio.TimeoutError:
+                pass
+
+    sampler = asyncio.create_task(sample_server())
+    results = await asyncio.gather(*(
+        run_session(no, base_url, pdf_bytes, args.iterations, gate) for no in range(args.sessions)
+    ))
+    if "t0" not in marks:  # 모든 세션이 접속 단계에서 실패
+        on_start()
+    metrics = {
+        "wall": time.perf_counter() - marks["t0"],
+        "cpu": None if marks["cpu0"] is None else process_cpu(server_pid) - marks["cpu0"],
+        "client_cpu": time.process_time() - marks["client_cpu0"],
+        "rss_start": marks["rss0"],
+        "rss_end": process_rss(server_pid),
+    }
+    stop.set()
+    await sampler
+    metrics["rss_peak"] = max(samples) if samples else None
+    return results, metrics
+
+
+# ------------------------------
+# 🔹 서버 기동 + 합산
+# ------------------------------
+
+def start_server(port, workdir, log):
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", APP_FILE,
+        "--server.headless=true", "--server.address=127.0.0.1", f"--server.port={port}",
+        "--server.fileWatcherType=none", "--browser.gatherUsageStats=false",
+        # 헤드리스 클라이언트는 XSRF 쿠키를 받지 않으므로 업로드 PUT 검사를 끈다 (127.0.0.1 에만 바인드)
+        "--server.enableXsrfProtection=false",
+    ]
+    server = subprocess.Popen(cmd, cwd=workdir, env=os.environ.copy(), stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + SERVER_START_TIMEOUT_SEC
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"서버가 시작 중 종료됨 (exit {server.returncode})")
+        try:
+            if requests.get(base_url + "/_stcore/health", timeout=2).ok:
+                return server, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    server.terminate()
+    raise RuntimeError(f"서버가 {SERVER_START_TIMEOUT_SEC}초 안에 응답하지 않음")
+
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LTV 계산기 동시 세션 부하 테스트 (실제 서버 + websocket 클라이언트)")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=12, help="합성 등기부 PDF 페이지 수")
+    parser.add_argument("--port", type=int, default=0, help="서버 포트 (0 이면 빈 포트)")
+    parser.add_argument("--keep", action="store_true", help="임시 작업 폴더 + 서버 로그 유지")
+    args = parser.parse_args()
+
+    # 실제 이력 / Notion 대신 임시 폴더 + 로컬 스텁 사용 (서버 프로세스는 이 환경변수를 물려받음)
+    workdir = tempfile.mkdtemp(prefix="ltv_loadtest_")
+    os.environ["NOTION_BACKEND"] = "local"
+    os.environ["NOTION_LOCAL_FILE"] = os.path.join(workdir, "notion_local.jsonl")
+    sys.path.insert(0, APP_DIR)
+
+    from bench_pdf_extract import make_registry_pdf
+    from pdf_utils import process_pdf
+    from price_provider import price_key_from_text
+
+    pdf_bytes = make_registry_pdf(args.pages)
+
+    # KB시세 자동조회도 로컬 stub provider 로 (합성 PDF 의 조회 키에 시세 한 건 등록)
+    key = price_key_from_text(process_pdf(pdf_bytes)[0])
+    prices_csv = os.path.join(workdir, "kb_prices.csv")
+    with open(prices_csv, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([["주소", "면적", "구분", "시세"], [key.address, key.area, key.price_type, 85000]])
+    os.environ["KB_PRICE_PROVIDER"] = f"stub:{prices_csv}"
+
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "wb") as log:
+        server, base_url = start_server(args.port or free_port(), workdir, log)
+        rss_idle = process_rss(server.pid)
+        try:
+            results, metrics = asyncio.run(drive(args, base_url, server.pid, pdf_bytes))
+        finally:
+            stop_server(server)
+
+    by_step = defaultdict(list)
+    runs = Counter()
+    errors = []
+    for res in results:
+        for name, values in res["latencies"].items():
+            by_step[name].extend(values)
+        runs += res["runs"]
+        errors += [f"#{res['no']} {e}" for e in res["errors"]]
+    all_values = [v for values in by_step.values() for v in values]
+    wall = metrics["wall"]
+    cpu = metrics["cpu"]
+    n = max(args.sessions, 1)
+    growth = None
+    if metrics["rss_start"] is not None and metrics["rss_end"] is not None:
+        growth = metrics["rss_end"] - metrics["rss_start"]
+
+    print(f"sessions={args.sessions} iterations={args.iterations} pages={args.pages} "
+          f"wall={wall:.1f}s (서버 프로세스 1개, websocket 세션 {args.sessions}개)")
+    print(f"재실행 {len(all_values):,}회 (서버 기준, 접속 첫 실행 포함: 전체 {runs['full']:,}회 / fragment {runs['fragment']:,}회), "
+          f"처리량 {len(all_values) / wall:.1f} reruns/s")
+    print(f"{'step':<8} {'count':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for name in list(by_step) + ["전체"]:
+        values = all_values if name == "전체" else by_step[name]
+        print(f"{name:<8} {len(values):>6} " + " ".join(
+            f"{percentile(values, p):>8.0f}" for p in (50, 90, 95, 99, 100)))
+    if cpu is None:
+        print("서버 CPU: 측정 불가")
+    else:
+        print(f"서버 CPU: {cpu:.1f}s (wall 대비 {cpu / wall * 100:.0f}%), 세션 수로 나누면 {cpu / n:.2f}s "
+              f"/ 부하 클라이언트 CPU {metrics['client_cpu']:.1f}s")
+    print(f"서버 RSS: 기동 직후 {format_mb(rss_idle)}, 부하 시작 {format_mb(metrics['rss_start'])}, "
+          f"종료 {format_mb(metrics['rss_end'])}, 샘플 최대 {format_mb(metrics['rss_peak'])}")
+    print(f"  부하 구간 증가 {format_mb(growth)} ÷ 세션 {args.sessions}개 = "
+          f"세션당 약 {format_mb(None if growth is None else growth / n)}")
+    if psutil is None:
+        print("  (psutil 미설치: Linux /proc 로 측정, 지원하지 않는 OS 에서는 측정 불가)")
+    if errors:
+        print(f"⚠️ 오류 {len(errors)}건")
+        for e in errors[:20]:
+            print("  " + e)
+
+    if args.keep:
+        print(f"작업 폴더: {workdir} (서버 로그: {log_path})")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
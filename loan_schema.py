@@ -0,0 +1,155 @@
+import re
+import ast
+import sys
+import json
+from dataclasses import dataclass, asdict
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 으로 대체
+    orjson = None
+
+# ─────────────────────────────
+# 🏦 대출항목 스키마 (저장 형식: 정수 금액을 가진 JSON 배열)
+# ─────────────────────────────
+# [{"lender": "국민은행", "max_amount": 12000, "ratio": 120, "principal": 10000, "status": "유지"}, ...]
+# 금액 단위는 화면과 같은 만원. 예전 기록(repr 문자열)은 decode_loans 에서 ast.literal_eval 로 안전하게 읽는다.
+
+LOAN_STATUSES = ("유지", "대환", "선말소")
+DEFAULT_RATIO = 120
+
+# 화면 입력(dict) 키 ↔ 스키마 필드
+FORM_KEYS = {
+    "lender": "설정자",
+    "max_amount": "채권최고액",
+    "ratio": "설정비율",
+    "principal": "원금",
+    "status": "진행구분",
+}
+
+
+def _to_int(value, default=0):
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return default if value != value else int(value)
+    digits = re.sub(r"[^\d]", "", str(value or ""))
+    return int(digits) if digits else default
+
+
+@dataclass
+class LoanItem:
+    lender: str = ""
+    max_amount: int = 0
+    ratio: int = DEFAULT_RATIO
+    principal: int = 0
+    status: str = "유지"
+
+    @classmethod
+    def from_dict(cls, d):
+        # 스키마 키(영문)와 화면/예전 기록 키(한글)를 모두 받는다
+        get = lambda field: d.get(field, d.get(FORM_KEYS[field]))
+        status = str(get("status") or "유지")
+        return cls(
+            lender=str(get("lender") or "").strip(),
+            max_amount=_to_int(get("max_amount")),
+            ratio=_to_int(get("ratio"), DEFAULT_RATIO),
+            principal=_to_int(get("principal")),
+            status=status if status in LOAN_STATUSES else "유지",
+        )
+
+    def is_empty(self):
+        return not self.lender and not self.max_amount and not self.principal
+
+    def to_form(self):
+        return {
+            "설정자": self.lender,
+            "채권최고액": f"{self.max_amount:,}" if self.max_amount else "",
+            "설정비율": str(self.ratio),
+            "원금": f"{self.principal:,}",
+            "진행구분": self.status,
+        }
+
+
+def _as_loan(item):
+    return item if isinstance(item, LoanItem) else LoanItem.from_dict(item)
+
+
+def encode_loans(items):
+    loans = [asdict(_as_loan(item)) for item in (items or [])]
+    if orjson is not None:
+        return orjson.dumps(loans).decode("utf-8")
+    return json.dumps(loans, ensure_ascii=False, separators=(",", ":"))
+
+
+# 해석할 수 없는 값이면 ValueError (변환 도구용). 화면 / 리포트는 decode_loans 사용
+def parse_loans(raw):
+    if isinstance(raw, list):
+        return [_as_loan(item) for item in raw]
+    if not isinstance(raw, str) or not raw.strip():
+        return []
+    raw = raw.strip()
+    try:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError:
+        # 예전 형식: Python repr 문자열 → eval 대신 literal_eval
+        try:
+            data = ast.literal_eval(raw)
+        except (ValueError, SyntaxError) as e:
+            raise ValueError(f"대출항목 해석 실패: {raw[:80]}") from e
+    if not isinstance(data, list):
+        raise ValueError(f"대출항목이 목록이 아님: {raw[:80]}")
+    return [LoanItem.from_dict(item) for item in data if isinstance(item, dict)]
+
+
+def decode_loans(raw):
+    try:
+        return parse_loans(raw)
+    except ValueError:
+        return []
+
+
+# ------------------------------
+# 🔹 기존 이력 파일 변환
+# ------------------------------
+
+# (변환한 행 수, 해석하지 못한 행 번호 목록) 반환
+# - 모든 열을 문자열 그대로 읽고 써서 다른 열 값(100 → 100.0 등)은 바뀌지 않는다
+# - 해석하지 못한 셀은 원래 값 그대로 두고 행 번호(파일 기준, 헤더 = 1행)만 보고한다
+def migrate_history_file(path, column="대출항목"):
+    import pandas as pd
+
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    if column not in df.columns:
+        return 0, []
+    changed = 0
+    failed = []
+    values = []
+    for row_no, raw in enumerate(df[column], start=2):
+        if not raw.strip():
+            values.append(raw)
+            continue
+        try:
+            new = encode_loans(parse_loans(raw))
+        except ValueError:
+            failed.append(row_no)
+            new = raw
+        if new != raw:
+            changed += 1
+        values.append(new)
+    if changed:
+        df[column] = values
+        df.to_csv(path, index=False)
+    return changed, failed
+
+
+if __name__ == "__main__":
+    # python loan_schema.py [ltv_input_history.csv]
+    target = sys.argv[1] if len(sys.argv) > 1 else "ltv_input_history.csv"
+    changed, failed = migrate_history_file(target)
+    print(f"✅ {target}: {changed}개 행 변환")
+    if failed:
+        print(f"⚠️ 해석하지 못해 그대로 둔 행 {len(failed)}개: {', '.join(map(str, failed))}")
+        sys.exit(1)
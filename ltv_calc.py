@@ -0,0 +1,62 @@
+import re
+
+# ─────────────────────────────
+# 🧮 LTV 계산 (화면 / 일괄 리포트 공용, 금액 단위: 만원)
+# ─────────────────────────────
+
+def parse_korean_number(text: str) -> int:
+    txt = str(text or "").replace(",", "").strip()
+    total = 0
+    m = re.search(r"(\d+)\s*억", txt)
+    if m:
+        total += int(m.group(1)) * 10000
+    m = re.search(r"(\d+)\s*천만", txt)
+    if m:
+        total += int(m.group(1)) * 1000
+    m = re.search(r"(\d+)\s*만", txt)
+    if m:
+        total += int(m.group(1))
+    if total == 0:
+        try:
+            total = int(txt)
+        except:
+            total = 0
+    return total
+
+# ✅ 층수 기준 시세 구분: 2층 이하는 하안가, 그 외(층수 모름 포함)는 일반가
+LOW_FLOOR_MAX = 2
+
+def price_type_for_floor(floor):
+    return "하안가" if floor and floor <= LOW_FLOOR_MAX else "일반가"
+
+def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
+    if is_senior:
+        limit = int(total_value * (ltv / 100) - deduction)
+        available = int(limit - principal_sum)
+    else:
+        limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
+        available = int(limit - principal_sum)
+    limit = (limit // 10) * 10
+    available = (available // 10) * 10
+    return limit, available
+
+# ✅ 진행구분별 합계 (loans: loan_schema.LoanItem 목록)
+def loan_sums(loans):
+    return {
+        "대환": sum(l.principal for l in loans if l.status == "대환"),
+        "선말소": sum(l.principal for l in loans if l.status == "선말소"),
+        "유지": sum(l.max_amount for l in loans if l.status == "유지"),
+        "후순위원금": sum(l.principal for l in loans if l.status != "유지"),
+    }
+
+# ✅ LTV별 (한도, 가용) — 유지 항목이 있으면 후순위, 없으면 선순위
+def compute_limits(total_value, deduction, loans, ltvs):
+    sums = loan_sums(loans)
+    limit_senior_dict = {}
+    limit_sub_dict = {}
+    for ltv in ltvs:
+        if sums["유지"] > 0:
+            limit_sub_dict[ltv] = calculate_ltv(total_value, deduction, sums["후순위원금"], sums["유지"], ltv, is_senior=False)
+        else:
+            limit_senior_dict[ltv] = calculate_ltv(total_value, deduction, sums["대환"] + sums["선말소"], 0, ltv, is_senior=True)
+    return limit_senior_dict, limit_sub_dict
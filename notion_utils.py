@@ -1,12 +1,53 @@
 
-from notion_client import Client
 import os
+import json
+import uuid
+import threading
 from datetime import datetime, timedelta
 import streamlit as st  # st.secrets용
 
 
+# 🧪 로컬 Notion 대체 클라이언트 (NOTION_BACKEND=local, 부하 테스트 / 오프라인용)
+# pages.create / pages.update / databases.query 만 흉내 내고 JSONL 파일에 기록한다.
+class LocalNotionClient:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.pages = self
+        self.databases = self
+
+    def _write(self, record):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def create(self, parent, properties):
+        page = {"id": uuid.uuid4().hex, "parent": parent, "properties": properties, "archived": False}
+        self._write({"op": "create", **page})
+        return page
+
+    def update(self, page_id, **kwargs):
+        self._write({"op": "update", "id": page_id, **kwargs})
+        return {"id": page_id, **kwargs}
+
+    def query(self, database_id, **kwargs):
+        pages = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    rec = json.loads(line)
+                    if rec["op"] == "create":
+                        pages[rec["id"]] = rec
+                    elif rec["id"] in pages:
+                        pages[rec["id"]].update({k: v for k, v in rec.items() if k not in ("op", "id")})
+        return {"results": [p for p in pages.values() if not p.get("archived")]}
+
+
 # 🔐 Notion 클라이언트 초기화 함수
 def get_notion_client():
+    if os.getenv("NOTION_BACKEND") == "local":
+        return LocalNotionClient(os.getenv("NOTION_LOCAL_FILE", "notion_local.jsonl")), "local"
+    from notion_client import Client
+
     try:
         token = (
             os.getenv("NOTION_TOKEN")
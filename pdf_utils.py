@@ -0,0 +1,172 @@
+import os
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+
+# ─────────────────────────────
+# 📄 등기부 PDF 처리 (텍스트 추출 + 필드 추출 + 미리보기)
+# ─────────────────────────────
+# 워커 프로세스에서 import 해야 하므로 Streamlit 에 의존하지 않는다.
+
+# 이 페이지 수 이상이면 병렬 추출 (프로세스 간 전달 비용이 페이지 처리 비용보다 작아지는 지점)
+# 60 은 실측값이 아닌 잠정값이다. 서버(멀티코어)에서 bench_pdf_extract.py 를 돌려 출력되는
+# 교차 지점으로 LTV_PARALLEL_PAGE_THRESHOLD 를 맞춘다. 코어가 1개면 항상 순차 처리.
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("LTV_PARALLEL_PAGE_THRESHOLD", "60"))
+MAX_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# ------------------------------
+# 🔹 텍스트 기반 추출 함수들
+# ------------------------------
+
+def extract_address(text):
+    m = re.search(r"\[집합건물\]\s*([^\n]+)", text)
+    if m:
+        return m.group(1).strip()
+    m = re.search(r"소재지\s*[:：]?\s*([^\n]+)", text)
+    if m:
+        return m.group(1).strip()
+    return ""
+
+def extract_area_floor(text):
+    m = re.findall(r"(\d+\.\d+)\s*㎡", text.replace('\n', ' '))
+    area = f"{m[-1]}㎡" if m else ""
+    floor = None
+    addr = extract_address(text)
+    f_match = re.findall(r"제(\d+)층", addr)
+    if f_match:
+        floor = int(f_match[-1])
+    return area, floor
+
+def extract_all_names_and_births(text):
+    start = text.find("주요 등기사항 요약")
+    if start == -1:
+        return []
+    summary = text[start:]
+    lines = [l.strip() for l in summary.splitlines() if l.strip()]
+    result = []
+    for i in range(len(lines)):
+        if re.match(r"[가-힣]+ \(공유자\)|[가-힣]+ \(소유자\)", lines[i]):
+            name = re.match(r"([가-힣]+)", lines[i]).group(1)
+            if i + 1 < len(lines):
+                birth_match = re.match(r"(\d{6})-", lines[i + 1])
+                if birth_match:
+                    birth = birth_match.group(1)
+                    result.append((name, birth))
+    return result
+
+# ------------------------------
+# 🔹 페이지 텍스트 추출 (순차 / 병렬)
+# ------------------------------
+
+def _extract_doc_range(doc, start, end):
+    texts = []
+    links = []
+    for i in range(start, end):
+        page = doc.load_page(i)
+        texts.append(page.get_text("text"))
+        for link in page.get_links():
+            if "uri" in link:
+                links.append(link["uri"])
+    return start, texts, links
+
+# 워커 프로세스용: 전달받은 바이트로 문서를 열어 구간만 추출
+def _extract_page_range(pdf_bytes, start, end):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return _extract_doc_range(doc, start, end)
+    finally:
+        doc.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    # 프로세스 풀은 한 번만 만들어 재사용 (spawn: Streamlit 서버 스레드 상태를 복제하지 않음)
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+def _reset_pool(broken):
+    # 워커가 죽으면(OOM, MuPDF 크래시) 풀은 영구히 BrokenProcessPool → 버리고 다음 요청에서 새로 만든다
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+# 페이지 순서대로 (텍스트 목록, 외부 링크 목록) 반환
+# parallel=None 이면 페이지 수가 PARALLEL_PAGE_THRESHOLD 이상일 때만 병렬 처리
+def extract_pages(pdf_bytes, parallel=None, workers=None):
+    workers = workers or MAX_WORKERS
+    # 페이지 수 확인에 연 문서를 순차 추출에도 그대로 사용 (한 번만 연다)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        page_count = len(doc)
+        if parallel is None:
+            parallel = page_count >= PARALLEL_PAGE_THRESHOLD and workers > 1
+        if not parallel or page_count == 0:
+            _, texts, links = _extract_doc_range(doc, 0, page_count)
+            return texts, links
+    finally:
+        doc.close()
+
+    # 워커별로 연속된 페이지 구간을 나눠 맡기고, 시작 페이지 기준으로 다시 정렬
+    chunk = -(-page_count // workers)
+    ranges = [(s, min(s + chunk, page_count)) for s in range(0, page_count, chunk)]
+    pool = _get_pool()
+    try:
+        futures = [pool.submit(_extract_page_range, pdf_bytes, s, e) for s, e in ranges]
+        results = sorted((f.result() for f in futures), key=lambda r: r[0])
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        return extract_pages(pdf_bytes, parallel=False)
+
+    texts = []
+    links = []
+    for _, part_texts, part_links in results:
+        texts.extend(part_texts)
+        links.extend(part_links)
+    return texts, links
+
+# ------------------------------
+# 🔹 PDF 처리 함수
+# ------------------------------
+
+def process_pdf(pdf_bytes, parallel=None):
+    texts, external_links = extract_pages(pdf_bytes, parallel=parallel)
+    text = "".join(texts)
+
+    address = extract_address(text)
+    area, floor = extract_area_floor(text)
+    co_owners = extract_all_names_and_births(text)
+
+    return text, external_links, address, area, floor, co_owners
+
+def pdf_to_image(pdf_bytes, page_num, zoom=2.0):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        if page_num >= len(doc):
+            return None
+        page = doc.load_page(page_num)
+        mat = fitz.Matrix(zoom, zoom)
+        pix = page.get_pixmap(matrix=mat)
+        return pix.tobytes("png")
+    finally:
+        doc.close()
+
+def pdf_page_count(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return len(doc)
+    finally:
+        doc.close()
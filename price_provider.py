@@ -0,0 +1,235 @@
+import os
+import re
+import csv
+import json
+import time
+import threading
+import urllib.parse
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ltv_calc import price_type_for_floor
+
+# ─────────────────────────────
+# 🏷 KB시세 조회 클라이언트 (교체 가능한 provider + TTL 캐시 + 중복 요청 합치기 + 일괄 조회)
+# ─────────────────────────────
+# 조회 키 = (정규화 주소, 전용면적, 하안가/일반가). 같은 단지 · 면적 · 시세구분이면 호수가 달라도 같은 시세.
+# provider 설정 (환경변수 KB_PRICE_PROVIDER):
+#   stub:prices.csv                  → 로컬 CSV (주소, 면적, 구분, 시세) — 테스트 / 오프라인
+#   http://host/price?address={address}&area={area}&type={price_type}  → JSON {"price": 85000}
+# 금액 단위는 화면과 같은 만원.
+
+PRICE_TTL_SEC = 6 * 60 * 60
+PRICE_MISS_TTL_SEC = 60  # 시세 없음(None)은 짧게만 캐시 — 새로 등록된 시세를 6시간 동안 놓치지 않도록
+PRICE_CACHE_SIZE = 10000
+PRICE_WORKERS = 8
+
+PriceKey = namedtuple("PriceKey", ["address", "area", "price_type"])
+
+
+def normalize_address(address):
+    addr = re.sub(r"[\[\]()]", " ", str(address or ""))
+    addr = re.sub(r"집합건물|제\d+층|제?\d+호|\d+층", " ", addr)
+    return re.sub(r"\s+", " ", addr).strip()
+
+
+def price_key(address, area, floor):
+    m = re.search(r"\d+(?:\.\d+)?", str(area or ""))
+    return PriceKey(normalize_address(address), round(float(m.group()), 2) if m else 0.0, price_type_for_floor(floor))
+
+
+# 저장된 주소 문자열만 있을 때 (층은 주소의 "제N층" 에서)
+def price_key_from_address(address, area):
+    floors = re.findall(r"제(\d+)층", str(address or ""))
+    return price_key(address, area, int(floors[-1]) if floors else None)
+
+
+def price_key_from_text(text):
+    from pdf_utils import extract_address, extract_area_floor  # PyMuPDF 는 PDF 처리 시에만 필요
+
+    area, floor = extract_area_floor(text)
+    return price_key(extract_address(text), area, floor)
+
+
+# ------------------------------
+# 🔹 provider
+# ------------------------------
+
+class PriceProvider(ABC):
+    # 한 번에 보낼 수 있는 키 수 (1 이면 fetch_many 가 키마다 fetch 호출)
+    batch_size = 1
+
+    @abstractmethod
+    def fetch(self, key):
+        ...
+
+    def fetch_many(self, keys):
+        return {key: self.fetch(key) for key in keys}
+
+
+class StubPriceProvider(PriceProvider):
+    batch_size = 50
+
+    def __init__(self, prices=None, delay=0.0):
+        self.prices = dict(prices or {})
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, path, delay=0.0):
+        prices = {}
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                key = price_key(row["주소"], row["면적"], None)._replace(price_type=row.get("구분") or "일반가")
+                prices[key] = int(re.sub(r"[^\d]", "", row["시세"]) or 0)
+        return cls(prices, delay)
+
+    def fetch(self, key):
+        return self.fetch_many([key])[key]
+
+    def fetch_many(self, keys):
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return {key: self.prices.get(key) for key in keys}
+
+
+class HttpPriceProvider(PriceProvider):
+    def __init__(self, url_template, timeout=5.0):
+        self.url_template = url_template
+        self.timeout = timeout
+
+    def fetch(self, key):
+        url = self.url_template.format(**{k: urllib.parse.quote(str(v)) for k, v in key._asdict().items()})
+        with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+        price = data.get("price")
+        return int(price) if price else None
+
+
+# ------------------------------
+# 🔹 TTL + LRU 캐시
+# ------------------------------
+
+class TTLCache:
+    def __init__(self, ttl=PRICE_TTL_SEC, maxsize=PRICE_CACHE_SIZE, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._data = OrderedDict()  # key -> (만료시각, 값)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires < self.clock():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ------------------------------
+# 🔹 클라이언트
+# ------------------------------
+
+class PriceClient:
+    def __init__(self, provider, ttl=PRICE_TTL_SEC, maxsize=PRICE_CACHE_SIZE, workers=PRICE_WORKERS,
+                 miss_ttl=PRICE_MISS_TTL_SEC, clock=time.monotonic):
+        self.provider = provider
+        self.miss_ttl = miss_ttl
+        self.cache = TTLCache(ttl, maxsize, clock)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kb-price")
+        self._inflight = {}  # key -> Future (같은 키 동시 요청은 한 번만 provider 호출)
+        self._lock = threading.Lock()
+
+    def _fetch_batch(self, keys, futures):
+        try:
+            prices = self.provider.fetch_many(keys)
+            for key in keys:
+                price = prices.get(key)
+                # 시세 없음은 miss_ttl 동안만 캐시 (0 이면 캐시하지 않음), 오류는 캐시하지 않음
+                if price is not None:
+                    self.cache.set(key, price)
+                elif self.miss_ttl:
+                    self.cache.set(key, None, ttl=self.miss_ttl)
+                futures[key].set_result(price)
+        except Exception as e:
+            for key in keys:
+                if not futures[key].done():
+                    futures[key].set_exception(e)
+        finally:
+            with self._lock:
+                for key in keys:
+                    self._inflight.pop(key, None)
+
+    def _submit(self, keys):
+        # 캐시에 없는 키 중 진행 중인 요청이 없는 것만 provider 로 보냄
+        waiting = {}
+        new_keys = []
+        with self._lock:
+            for key in keys:
+                if key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                else:
+                    waiting[key] = self._inflight[key] = Future()
+                    new_keys.append(key)
+        size = max(1, self.provider.batch_size)
+        for i in range(0, len(new_keys), size):
+            self._pool.submit(self._fetch_batch, new_keys[i:i + size], waiting)
+        return waiting
+
+    def get_many(self, keys, timeout=None):
+        result = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            hit, value = self.cache.get(key)
+            if hit:
+                result[key] = value
+            else:
+                missing.append(key)
+        for key, future in self._submit(missing).items():
+            try:
+                result[key] = future.result(timeout=timeout)
+            except Exception:
+                result[key] = None
+        return result
+
+    def get(self, key, timeout=None):
+        return self.get_many([key], timeout=timeout)[key]
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_price_client():
+    global _default_client
+    spec = os.getenv("KB_PRICE_PROVIDER", "")
+    if not spec:
+        return None
+    with _default_lock:
+        if _default_client is None:
+            if spec.startswith("stub:"):
+                provider = StubPriceProvider.from_csv(spec[len("stub:"):])
+            else:
+                provider = HttpPriceProvider(spec)
+            _default_client = PriceClient(provider)
+        return _default_client
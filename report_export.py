@@ -0,0 +1,299 @@
+import os
+import re
+import csv
+import uuid
+import threading
+from datetime import datetime
+
+from ltv_map import region_map
+from ltv_calc import parse_korean_number, compute_limits, loan_sums
+from loan_schema import decode_loans
+from history_manager import iter_latest_records, count_latest_records
+from price_provider import get_price_client, price_key_from_address
+
+# ─────────────────────────────
+# 📊 월말 일괄 LTV 리포트 (CSV / XLSX / PDF 스트리밍 저장)
+# ─────────────────────────────
+# 이력에서 고객을 한 명씩 읽어 바로 파일에 쓰므로 고객 수와 무관하게 메모리 사용량이 일정하다.
+
+REPORT_DIR = "reports"
+DEFAULT_LTVS = (70, 80)
+REPORT_FORMATS = ("csv", "xlsx", "pdf")
+PRICE_LOOKUP_CHUNK = 100  # KB시세가 비어 있는 고객은 이만큼 모아 한 번에 조회
+
+
+def _to_int(value):
+    digits = re.sub(r"[^\d]", "", str(value or ""))
+    return int(digits) if digits else 0
+
+
+def report_columns(ltvs):
+    cols = ["고객명", "주소", "KB시세", "시세출처", "방공제", "대환", "선말소", "유지(채권최고액)"]
+    for ltv in ltvs:
+        cols += [f"LTV{ltv}% 구분", f"LTV{ltv}% 한도", f"LTV{ltv}% 가용"]
+    cols += ["컨설팅수수료", "브릿지수수료", "수수료", "저장일시"]
+    return cols
+
+
+def build_report_row(record, ltvs):
+    total_value = parse_korean_number(record.get("KB시세", ""))
+    price_source = record.get("시세출처") or ("입력" if total_value else "")
+    # 방공제가 비어 있으면 저장된 지역의 기본 방공제 사용
+    deduction = _to_int(record.get("방공제")) if str(record.get("방공제") or "").strip() else region_map.get(record.get("지역", ""), 0)
+    loans = decode_loans(record.get("대출항목"))
+    sums = loan_sums(loans)
+    senior, sub = compute_limits(total_value, deduction, loans, ltvs)
+
+    row = [
+        record.get("고객명", ""),
+        record.get("주소", ""),
+        total_value,
+        price_source,
+        deduction,
+        sums["대환"],
+        sums["선말소"],
+        sums["유지"],
+    ]
+    for ltv in ltvs:
+        if ltv in senior:
+            row += ["선순위", *senior[ltv]]
+        else:
+            row += ["후순위", *sub[ltv]]
+    row += [
+        _to_int(record.get("컨설팅수수료")),
+        _to_int(record.get("브릿지수수료")),
+        _to_int(record.get("수수료")),
+        record.get("저장일시", ""),
+    ]
+    return row
+
+
+# ------------------------------
+# 🔹 형식별 writer (header → row ... → close)
+# ------------------------------
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._f = open(path, "w", newline="", encoding="utf-8-sig")
+        self._w = csv.writer(self._f)
+
+    def write_row(self, values):
+        self._w.writerow(values)
+
+    def close(self):
+        self._f.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("LTV 리포트")
+
+    def write_row(self, values):
+        self._ws.append(values)
+
+    def close(self):
+        self._wb.save(self._path)
+
+
+class _PdfWriter:
+    # A4 가로 표: 고정 열 너비, 칸에 안 들어가는 값은 줄바꿈
+    # 한글 폰트는 PyMuPDF 의 CJK 폰트(Font("korea"))를 문서에 포함해 그린다. insert_text(fontname="korea")
+    # 는 숫자 / 영문까지 전각 폭으로 그려 text_length 로 잰 폭과 달라지므로, 잰 폰트로 그대로 그린다.
+    WIDTH, HEIGHT = 842, 595
+    MARGIN = 30
+    FONT_SIZE = 6
+    LINE = 8
+    PAD = 2
+    # 열 너비 비율 (나머지 열은 1)
+    WEIGHTS = {"고객명": 1.3, "주소": 3.2, "시세출처": 0.9, "저장일시": 1.7}
+
+    def __init__(self, path):
+        import fitz  # PyMuPDF
+
+        self._fitz = fitz
+        self._font = fitz.Font("korea")
+        self._path = path
+        self._doc = fitz.open()
+        self._header = None
+        self._widths = []
+        self._page = None
+        self._y = 0
+
+    def _set_columns(self, header):
+        weights = [self.WEIGHTS.get(name, 1.0) for name in header]
+        usable = self.WIDTH - 2 * self.MARGIN
+        self._widths = [usable * w / sum(weights) for w in weights]
+
+    def _wrap(self, text, width):
+        # 글자 단위 줄바꿈 (한글 주소는 공백이 적어 단어 단위로는 칸을 넘는다)
+        limit = width - 2 * self.PAD
+        if self._font.text_length(text, fontsize=self.FONT_SIZE) <= limit:
+            return [text]
+        lines = []
+        line = ""
+        for ch in text:
+            if line and self._font.text_length(line + ch, fontsize=self.FONT_SIZE) > limit:
+                lines.append(line)
+                line = ch.lstrip()
+            else:
+                line += ch
+        lines.append(line)
+        return lines
+
+    def _new_page(self):
+        self._page = self._doc.new_page(width=self.WIDTH, height=self.HEIGHT)
+        self._y = self.MARGIN
+        if self._header:
+            self._draw_row(self._header)
+
+    def _row_height(self, cells):
+        return max(len(lines) for lines in cells) * self.LINE + 2 * self.PAD
+
+    def _draw_row(self, cells):
+        height = self._row_height(cells)
+        writer = self._fitz.TextWriter(self._page.rect)
+        x = self.MARGIN
+        for lines, width in zip(cells, self._widths):
+            for i, line in enumerate(lines):
+                writer.append(
+                    (x + self.PAD, self._y + self.PAD + (i + 1) * self.LINE - 2),
+                    line, font=self._font, fontsize=self.FONT_SIZE,
+                )
+            x += width
+        writer.write_text(self._page)
+        self._y += height
+        self._page.draw_line((self.MARGIN, self._y), (self.WIDTH - self.MARGIN, self._y), width=0.3)
+
+    def write_row(self, values):
+        if self._header is None:
+            self._set_columns(values)
+        cells = [
+            self._wrap(f"{v:,}" if isinstance(v, int) else str(v), width)
+            for v, width in zip(values, self._widths)
+        ]
+        if self._header is None:
+            self._header = cells
+            self._new_page()
+            return
+        height = self._row_height(cells)
+        if self._y + height > self.HEIGHT - self.MARGIN:
+            self._new_page()
+        self._draw_row(cells)
+
+    def close(self):
+        if self._page is None:
+            self._new_page()
+        self._doc.subset_fonts()  # 포함한 CJK 폰트(약 3.5MB)에서 실제 쓴 글자만 남김
+        self._doc.save(self._path, garbage=3, deflate=True)
+        self._doc.close()
+
+
+_WRITERS = {"csv": _CsvWriter, "xlsx": _XlsxWriter, "pdf": _PdfWriter}
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _fill_missing_prices(records):
+    client = get_price_client()
+    if client is None:
+        return
+    missing = {id(r): price_key_from_address(r.get("주소"), r.get("면적"))
+               for r in records if r.get("주소") and not parse_korean_number(r.get("KB시세", ""))}
+    if not missing:
+        return
+    prices = client.get_many(missing.values())
+    for r in records:
+        price = prices.get(missing.get(id(r)))
+        if price:
+            r["KB시세"] = str(price)
+            r["시세출처"] = "자동조회"
+
+
+def write_report(path, fmt="csv", ltvs=DEFAULT_LTVS, progress=None, should_stop=None):
+    writer = _WRITERS[fmt](path)
+    count = 0
+    try:
+        writer.write_row(report_columns(ltvs))
+        for chunk in _chunks(iter_latest_records(), PRICE_LOOKUP_CHUNK):
+            if should_stop and should_stop():
+                break
+            _fill_missing_prices(chunk)
+            for record in chunk:
+                writer.write_row(build_report_row(record, ltvs))
+                count += 1
+                if progress:
+                    progress(count)
+    finally:
+        writer.close()
+    return count
+
+
+# ------------------------------
+# 🔹 백그라운드 작업 (UI 스레드와 분리)
+# ------------------------------
+
+class ReportJob:
+    def __init__(self, fmt="csv", ltvs=DEFAULT_LTVS, report_dir=REPORT_DIR):
+        if fmt not in _WRITERS:
+            raise ValueError(f"지원하지 않는 리포트 형식: {fmt}")
+        os.makedirs(report_dir, exist_ok=True)
+        # 같은 초에 여러 작업이 시작돼도 파일이 겹치지 않도록 임의 접미사
+        stamp = f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}"
+        self.fmt = fmt
+        self.ltvs = tuple(ltvs)
+        self.path = os.path.join(report_dir, f"ltv_report_{stamp}.{fmt}")
+        self.total = 0
+        self.done = 0
+        self.status = "대기"
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ltv-report", daemon=True)
+
+    def start(self):
+        self.status = "진행중"
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _on_progress(self, count):
+        self.done = count
+
+    def _run(self):
+        try:
+            self.total = count_latest_records()
+            write_report(self.path, self.fmt, self.ltvs,
+                         progress=self._on_progress, should_stop=self._cancel.is_set)
+            self.status = "취소" if self._cancel.is_set() else "완료"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "실패"
+
+    @property
+    def finished(self):
+        return self.status in ("완료", "취소", "실패")
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else (1.0 if self.finished else 0.0)
+
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
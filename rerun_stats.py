@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# ─────────────────────────────
+# ⏱ 구간별 재실행 횟수 / 소요시간 (세션 단위)
+# ─────────────────────────────
+# st.session_state["rerun_stats"] = {"구간": {"count": n, "total_ms": x, "last_ms": y}}
+# 사이드바 "재실행 통계"에 표시한다 (AppTest 는 fragment 를 지원하지 않아 bench_reruns.py 는 이 값을 쓰지 않음).
+
+STATS_KEY = "rerun_stats"
+
+
+def record(name, elapsed_ms):
+    stats = st.session_state.setdefault(STATS_KEY, {})
+    s = stats.setdefault(name, {"count": 0, "total_ms": 0.0, "last_ms": 0.0})
+    s["count"] += 1
+    s["total_ms"] += elapsed_ms
+    s["last_ms"] = elapsed_ms
+
+
+@contextmanager
+def timed_section(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - t0) * 1000)
+
+
+def stats_rows():
+    return [
+        {
+            "구간": name,
+            "횟수": s["count"],
+            "최근(ms)": round(s["last_ms"], 1),
+            "평균(ms)": round(s["total_ms"] / s["count"], 1) if s["count"] else 0.0,
+        }
+        for name, s in st.session_state.get(STATS_KEY, {}).items()
+    ]
@@ -0,0 +1,234 @@
+import sys
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# ─────────────────────────────
+# 🧠 세션 문서 메모리 관리 (공유 · 해시 참조 · 축출 가능 저장소)
+# ─────────────────────────────
+# 업로드 PDF 원본, 추출 결과, 미리보기 PNG 같은 큰 데이터는 st.session_state 에
+# 직접 두지 않고 이 저장소에 넣은 뒤 해시 키만 세션에 보관한다.
+# 같은 파일을 여러 세션이 올리면 한 번만 저장되고, 예산을 넘으면 오래 쓰지 않은
+# 항목부터 지워진다. 지워진 항목은 get() 이 None 을 돌려주므로 호출부에서 다시 만든다.
+# 원본에서 파생된 항목(추출 결과, 페이지 PNG 등)은 parent 로 원본 키에 묶어 두고,
+# release(원본 키) 한 번으로 함께 반환한다.
+
+SESSION_BUDGET_BYTES = 64 * 1024 * 1024    # 세션당 64MB
+GLOBAL_BUDGET_BYTES = 512 * 1024 * 1024    # 프로세스 전체 512MB
+IDLE_TIMEOUT_SEC = 30 * 60                 # 30분 동안 재실행이 없으면 세션 정리
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _sizeof(value) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class DocumentStore:
+    def __init__(self, global_budget=GLOBAL_BUDGET_BYTES, session_budget=SESSION_BUDGET_BYTES,
+                 idle_timeout=IDLE_TIMEOUT_SEC):
+        self.global_budget = global_budget
+        self.session_budget = session_budget
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._blobs = OrderedDict()   # key -> (value, nbytes), 전역 LRU 순서
+        self._refs = {}               # key -> 참조 중인 session_id 집합
+        self._sessions = {}           # session_id -> {"keys": OrderedDict, "last_seen": float}
+        self._evictions = 0
+
+    # ------------------------------
+    # 🔹 세션 관리
+    # ------------------------------
+
+    def _session(self, session_id):
+        sess = self._sessions.get(session_id)
+        if sess is None:
+            sess = {"keys": OrderedDict(), "derived": {}, "last_seen": time.time()}
+            self._sessions[session_id] = sess
+        return sess
+
+    def touch(self, session_id):
+        with self._lock:
+            self._session(session_id)["last_seen"] = time.time()
+
+    def release(self, session_id, key):
+        with self._lock:
+            keys = [key]
+            sess = self._sessions.get(session_id)
+            if sess is not None:
+                keys += sess["derived"].pop(key, ())
+                for k in keys:
+                    sess["keys"].pop(k, None)
+            for k in keys:
+                self._drop_ref(session_id, k)
+
+    def release_session(self, session_id):
+        with self._lock:
+            sess = self._sessions.pop(session_id, None)
+            if sess is None:
+                return
+            for key in list(sess["keys"]):
+                self._drop_ref(session_id, key)
+
+    def sweep_idle(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            idle = [sid for sid, sess in self._sessions.items()
+                    if now - sess["last_seen"] > self.idle_timeout]
+            for sid in idle:
+                self.release_session(sid)
+        return idle
+
+    # ------------------------------
+    # 🔹 저장 / 조회
+    # ------------------------------
+
+    def put(self, session_id, value, key=None, parent=None):
+        if key is None:
+            key = content_key(value)
+        with self._lock:
+            if key not in self._blobs:
+                self._blobs[key] = (value, _sizeof(value))
+            self._blobs.move_to_end(key)
+            self._refs.setdefault(key, set()).add(session_id)
+            sess = self._session(session_id)
+            sess["keys"][key] = None
+            sess["keys"].move_to_end(key)
+            if parent is not None and parent != key:
+                sess["derived"].setdefault(parent, set()).add(key)
+            sess["last_seen"] = time.time()
+            self._enforce_session_budget(session_id, keep=key)
+            self._enforce_global_budget(keep=key)
+        return key
+
+    def get(self, session_id, key):
+        with self._lock:
+            entry = self._blobs.get(key)
+            if entry is None:
+                return None
+            self._blobs.move_to_end(key)
+            self._refs.setdefault(key, set()).add(session_id)
+            sess = self._session(session_id)
+            sess["keys"][key] = None
+            sess["keys"].move_to_end(key)
+            sess["last_seen"] = time.time()
+            return entry[0]
+
+    def get_or_create(self, session_id, key, factory, parent=None):
+        value = self.get(session_id, key)
+        if value is None:
+            value = factory()
+            if value is not None:
+                self.put(session_id, value, key=key, parent=parent)
+        return value
+
+    # ------------------------------
+    # 🔹 예산 관리
+    # ------------------------------
+
+    def _drop_ref(self, session_id, key):
+        refs = self._refs.get(key)
+        if refs is None:
+            return
+        refs.discard(session_id)
+        if not refs:
+            self._refs.pop(key, None)
+            self._blobs.pop(key, None)
+
+    def _evict(self, key):
+        for sid in self._refs.pop(key, set()):
+            sess = self._sessions.get(sid)
+            if sess is not None:
+                sess["keys"].pop(key, None)
+        self._blobs.pop(key, None)
+        self._evictions += 1
+
+    # 축출 순서: 파생 항목(원본에서 다시 만들 수 있음)을 LRU 순으로 먼저, 원본은 그다음
+    @staticmethod
+    def _eviction_order(keys, derived):
+        keys = list(keys)
+        return [k for k in keys if k in derived] + [k for k in keys if k not in derived]
+
+    def _derived_keys(self, sessions):
+        return {k for sess in sessions for keys in sess["derived"].values() for k in keys}
+
+    def _enforce_session_budget(self, session_id, keep=None):
+        sess = self._sessions.get(session_id)
+        if sess is None:
+            return
+        for key in self._eviction_order(sess["keys"], self._derived_keys([sess])):
+            if self._session_bytes(session_id) <= self.session_budget:
+                break
+            if key == keep:
+                continue
+            sess["keys"].pop(key, None)
+            self._drop_ref(session_id, key)
+            self._evictions += 1
+
+    def _enforce_global_budget(self, keep=None):
+        if self._global_bytes() <= self.global_budget:
+            return
+        for key in self._eviction_order(self._blobs, self._derived_keys(self._sessions.values())):
+            if self._global_bytes() <= self.global_budget:
+                break
+            if key == keep:
+                continue
+            self._evict(key)
+
+    # ------------------------------
+    # 🔹 메트릭
+    # ------------------------------
+
+    def _global_bytes(self):
+        return sum(nbytes for _, nbytes in self._blobs.values())
+
+    def _session_bytes(self, session_id):
+        sess = self._sessions.get(session_id)
+        if sess is None:
+            return 0
+        return sum(self._blobs[k][1] for k in sess["keys"] if k in self._blobs)
+
+    def session_bytes(self, session_id):
+        with self._lock:
+            return self._session_bytes(session_id)
+
+    def metrics(self):
+        with self._lock:
+            now = time.time()
+            return {
+                "global_bytes": self._global_bytes(),
+                "global_budget": self.global_budget,
+                "session_budget": self.session_budget,
+                "blob_count": len(self._blobs),
+                "evictions": self._evictions,
+                "sessions": {
+                    sid: {
+                        "bytes": self._session_bytes(sid),
+                        "items": len(sess["keys"]),
+                        "idle_sec": int(now - sess["last_seen"]),
+                    }
+                    for sid, sess in self._sessions.items()
+                },
+            }
+
+
+# ✅ 프로세스 전역 저장소 (Streamlit 은 모듈을 한 번만 import 하므로 모든 세션이 공유)
+document_store = DocumentStore()
+
+
+def format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:,.0f}{unit}" if unit == "B" else f"{n:,.1f}{unit}"
+        n /= 1024
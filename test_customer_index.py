@@ -0,0 +1,69 @@
+# test_customer_index.py
+#   python -m pytest -q test_customer_index.py
+from customer_index import CustomerIndex
+
+
+def ts(n):
+    return f"2025-06-01 10:{n // 60:02d}:{n % 60:02d}"
+
+
+def make_index():
+    return CustomerIndex({
+        "홍길동": ts(1),
+        "홍길순": ts(5),
+        "김홍길": ts(3),
+        "이몽룡": ts(4),
+        "길동": ts(2),
+    })
+
+
+def test_empty_query_pages_by_most_recent_save():
+    index = make_index()
+    assert index.search("", 0, 2) == (["홍길순", "이몽룡"], 5)
+    assert index.search("", 1, 2) == (["김홍길", "길동"], 5)
+    assert index.search("", 2, 2) == (["홍길동"], 5)
+    assert index.search("", 3, 2) == ([], 5)
+
+
+def test_query_ranks_exact_then_prefix_then_contains_then_recency():
+    index = make_index()
+    names, total = index.search("길동", 0, 10)
+    assert total == 2
+    assert names == ["길동", "홍길동"]
+    names, total = index.search("홍길", 0, 10)
+    assert names == ["홍길순", "홍길동", "김홍길"]  # 앞부분 일치(최근순) → 포함
+    assert total == 3
+
+
+def test_single_character_query_and_no_match():
+    index = make_index()
+    assert index.search("몽", 0, 10) == (["이몽룡"], 1)
+    assert index.search("없음", 0, 10) == ([], 0)
+
+
+def test_query_pages_share_one_ranking():
+    index = make_index()
+    first, total = index.search("길", 0, 2)
+    second, _ = index.search("길", 1, 2)
+    assert total == 4
+    assert first + second == index.search("길", 0, 4)[0]
+
+
+def test_upsert_moves_customer_to_front_and_invalidates_cache():
+    index = make_index()
+    assert index.search("", 0, 1) == (["홍길순"], 5)
+    index.upsert("홍길동", ts(9))
+    assert index.search("", 0, 1) == (["홍길동"], 5)
+    index.upsert("성춘향", ts(10))
+    assert len(index) == 6
+    assert index.search("춘향", 0, 10) == (["성춘향"], 1)
+
+
+def test_remove_drops_customer_from_recency_and_grams():
+    index = make_index()
+    index.search("길동", 0, 10)  # 캐시에 올려 둠
+    index.remove("홍길동")
+    index.remove("없는고객")
+    assert len(index) == 4
+    assert index.search("길동", 0, 10) == (["길동"], 1)
+    assert "홍길동" not in index.search("", 0, 10)[0]
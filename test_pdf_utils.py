@@ -0,0 +1,22 @@
+# test_pdf_utils.py
+#   python -m pytest -q test_pdf_utils.py
+import os
+
+import pdf_utils
+from bench_pdf_extract import make_registry_pdf
+
+
+def test_parallel_extraction_matches_sequential():
+    data = make_registry_pdf(6)
+    assert pdf_utils.extract_pages(data, parallel=True, workers=2) == pdf_utils.extract_pages(data, parallel=False)
+
+
+def test_broken_pool_falls_back_to_sequential_and_is_replaced():
+    data = make_registry_pdf(6)
+    expected = pdf_utils.extract_pages(data, parallel=False)
+    broken = pdf_utils._get_pool()
+    broken.submit(os._exit, 1).exception()  # 워커 프로세스 강제 종료 → 풀 고장
+    assert pdf_utils.extract_pages(data, parallel=True, workers=2) == expected
+    assert pdf_utils._pool is not broken
+    assert pdf_utils.extract_pages(data, parallel=True, workers=2) == expected
+    assert pdf_utils._pool is not None and pdf_utils._pool is not broken
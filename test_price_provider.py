@@ -0,0 +1,134 @@
+# test_price_provider.py
+#   python -m pytest -q test_price_provider.py
+import threading
+
+import pytest
+
+from price_provider import PriceClient, PriceKey, PriceProvider, StubPriceProvider, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_key(i):
+    return PriceKey(f"서울특별시 강남구 역삼동 {i}", 84.99, "일반가")
+
+
+class FailingOnceProvider(PriceProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self, key):
+        self.calls += 1
+        if self.calls == 1:
+            raise OSError("timeout")
+        return 85000
+
+
+def test_price_provider_is_abstract():
+    with pytest.raises(TypeError):
+        PriceProvider()
+
+
+def test_cache_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, maxsize=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 10
+    assert cache.get("a") == (True, 1)
+    clock.now = 10.1
+    assert cache.get("a") == (False, None)
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a 를 최근 사용으로
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+
+def test_client_serves_hits_from_cache_until_ttl():
+    clock = FakeClock()
+    key = make_key(1)
+    provider = StubPriceProvider({key: 85000})
+    client = PriceClient(provider, ttl=100, clock=clock)
+    assert client.get(key) == 85000
+    assert client.get(key) == 85000
+    assert provider.calls == 1
+    clock.now = 101
+    assert client.get(key) == 85000
+    assert provider.calls == 2
+
+
+def test_client_caches_misses_only_for_miss_ttl():
+    clock = FakeClock()
+    key = make_key(1)
+    provider = StubPriceProvider()
+    client = PriceClient(provider, ttl=100, miss_ttl=5, clock=clock)
+    assert client.get(key) is None
+    assert client.get(key) is None
+    assert provider.calls == 1
+    provider.prices[key] = 85000  # 나중에 시세가 등록됨
+    clock.now = 6
+    assert client.get(key) == 85000
+    assert provider.calls == 2
+
+
+def test_client_does_not_cache_misses_when_miss_ttl_is_zero():
+    key = make_key(1)
+    provider = StubPriceProvider()
+    client = PriceClient(provider, miss_ttl=0)
+    client.get(key)
+    client.get(key)
+    assert provider.calls == 2
+
+
+def test_client_does_not_cache_provider_errors():
+    provider = FailingOnceProvider()
+    client = PriceClient(provider)
+    assert client.get(make_key(1)) is None
+    assert client.get(make_key(1)) == 85000
+    assert provider.calls == 2
+
+
+def test_concurrent_gets_for_same_key_share_one_provider_call():
+    key = make_key(1)
+    provider = StubPriceProvider({key: 85000}, delay=0.3)
+    client = PriceClient(provider)
+    n = 10
+    barrier = threading.Barrier(n)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(client.get(key, timeout=5))
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [85000] * n
+    assert provider.calls == 1
+
+
+def test_get_many_batches_by_provider_batch_size():
+    keys = [make_key(i) for i in range(120)]
+    provider = StubPriceProvider({k: 80000 + i for i, k in enumerate(keys)})
+    client = PriceClient(provider)
+    prices = client.get_many(keys + keys[:10], timeout=5)  # 중복 키는 한 번만 조회
+    assert len(prices) == 120
+    assert prices[keys[7]] == 80007
+    assert provider.calls == 3  # 50 + 50 + 20
+    client.get_many(keys, timeout=5)
+    assert provider.calls == 3  # 전부 캐시 적중
@@ -0,0 +1,46 @@
+# test_report_export.py
+#   python -m pytest -q test_report_export.py
+from itertools import accumulate
+
+import fitz
+
+from report_export import _PdfWriter, build_report_row, report_columns
+
+LTVS = (70, 80)
+
+
+def make_record(i):
+    return {
+        "고객명": f"고객{i:03d}",
+        "주소": f"서울특별시 강남구 역삼동 {i}-1 래미안아파트 제{i % 20 + 1}층 제{i}01호",
+        "KB시세": f"{47490 + i * 1000:,}",
+        "방공제": "5,500",
+        "대출항목": '[{"lender":"국민은행","max_amount":12000,"principal":10000,"status":"유지"}]',
+        "수수료": "1,200",
+        "저장일시": "2025-06-01 10:00:00",
+    }
+
+
+def test_build_report_row_subtracts_deduction():
+    row = dict(zip(report_columns(LTVS), build_report_row(make_record(0), LTVS)))
+    assert row["방공제"] == 5500
+    # 후순위: 47,490 × 70% − 유지 12,000 − 방공제 5,500 = 15,743 → 10 단위 절사
+    assert row["LTV70% 한도"] == 15740
+
+
+def test_pdf_cells_stay_inside_their_columns(tmp_path):
+    path = str(tmp_path / "report.pdf")
+    writer = _PdfWriter(path)
+    writer.write_row(report_columns(LTVS))
+    for i in range(60):
+        writer.write_row(build_report_row(make_record(i), LTVS))
+    edges = [writer.MARGIN + w for w in accumulate(writer._widths)]
+    starts = [writer.MARGIN] + edges[:-1]
+    writer.close()
+
+    doc = fitz.open(path)
+    assert len(doc) >= 2
+    for page in doc:
+        for x0, _, x1, _, text, *_ in page.get_text("words"):
+            col = max(i for i, start in enumerate(starts) if x0 >= start - 0.5)
+            assert x1 <= edges[col] + 0.5, (text, x0, x1, edges[col])
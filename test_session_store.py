@@ -0,0 +1,92 @@
+# test_session_store.py
+#   python -m pytest -q test_session_store.py
+import session_store
+from session_store import DocumentStore, content_key
+
+
+def test_put_uses_content_hash_and_shares_between_sessions():
+    store = DocumentStore()
+    key_a = store.put("a", b"pdf")
+    key_b = store.put("b", b"pdf")
+    assert key_a == key_b == content_key(b"pdf")
+    assert store.metrics()["blob_count"] == 1
+    store.release("a", key_a)
+    assert store.get("b", key_b) == b"pdf"  # 다른 세션이 참조 중이면 남아 있음
+    store.release("b", key_b)
+    assert store.metrics()["blob_count"] == 0
+
+
+def test_release_drops_derived_keys_with_their_source():
+    store = DocumentStore()
+    pdf = store.put("a", b"x" * 100)
+    store.get_or_create("a", f"{pdf}:parsed", lambda: "text", parent=pdf)
+    store.get_or_create("a", f"{pdf}:png:0:2.0", lambda: b"p" * 50, parent=pdf)
+    other = store.put("a", b"other")
+    store.release("a", pdf)
+    assert store.get("a", f"{pdf}:parsed") is None
+    assert store.get("a", f"{pdf}:png:0:2.0") is None
+    assert store.get("a", other) == b"other"
+
+
+def test_get_or_create_rebuilds_evicted_value():
+    store = DocumentStore()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return b"v"
+
+    assert store.get_or_create("a", "k", factory) == b"v"
+    assert store.get_or_create("a", "k", factory) == b"v"
+    assert len(calls) == 1
+    store.release("a", "k")
+    store.get_or_create("a", "k", factory)
+    assert len(calls) == 2
+
+
+def test_session_budget_evicts_derived_items_before_source():
+    store = DocumentStore(session_budget=500)
+    pdf = store.put("a", b"x" * 300)
+    store.put("a", b"1" * 150, key=f"{pdf}:png:0", parent=pdf)
+    store.put("a", b"2" * 150, key=f"{pdf}:png:1", parent=pdf)
+    assert store.get("a", pdf) is not None
+    assert store.get("a", f"{pdf}:png:0") is None  # 가장 오래된 파생 항목부터
+    assert store.get("a", f"{pdf}:png:1") is not None
+    assert store.session_bytes("a") <= 500
+
+
+def test_session_budget_falls_back_to_lru_for_unrelated_items():
+    store = DocumentStore(session_budget=250)
+    old = store.put("a", b"o" * 100)
+    mid = store.put("a", b"m" * 100)
+    store.get("a", old)  # old 를 최근 사용으로
+    new = store.put("a", b"n" * 100)
+    assert store.get("a", mid) is None
+    assert store.get("a", old) is not None
+    assert store.get("a", new) is not None
+
+
+def test_global_budget_evicts_across_sessions_and_counts():
+    store = DocumentStore(global_budget=250, session_budget=1000)
+    first = store.put("a", b"a" * 100)
+    store.put("b", b"b" * 100)
+    store.put("c", b"c" * 100)
+    metrics = store.metrics()
+    assert metrics["global_bytes"] <= 250
+    assert metrics["evictions"] == 1
+    assert store.get("a", first) is None
+    assert store.session_bytes("a") == 0
+
+
+def test_sweep_idle_releases_only_idle_sessions(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(session_store.time, "time", lambda: clock[0])
+    store = DocumentStore(idle_timeout=60)
+    idle_key = store.put("idle", b"i")
+    clock[0] += 50
+    active_key = store.put("active", b"a")
+    clock[0] += 20
+    assert store.sweep_idle() == ["idle"]
+    assert store.get("active", active_key) == b"a"
+    assert store.get("active", idle_key) is None
+    assert "idle" not in store.metrics()["sessions"]
@@ -0,0 +1,115 @@
+# test_version_store.py
+#   python -m pytest -q test_version_store.py
+import json
+
+import history_manager
+from version_store import SNAPSHOT_EVERY, VersionStore
+
+
+def ts(n):
+    return f"2025-06-01 10:{n // 60:02d}:{n % 60:02d}"
+
+
+def record(name, n, **extra):
+    return {"고객명": name, "KB시세": f"{50000 + n:,}", "메모": "고정", "저장일시": ts(n), **extra}
+
+
+def read_ops(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["op"] for line in f]
+
+
+def test_latest_state_is_rebuilt_from_snapshots_and_deltas(tmp_path):
+    path = str(tmp_path / "versions.jsonl")
+    store = VersionStore(path)
+    for n in range(SNAPSHOT_EVERY * 2 + 3):
+        store.append("홍길동", ts(n), record("홍길동", n))
+    ops = read_ops(path)
+    assert ops.count("snapshot") == 3
+    assert ops[0] == ops[SNAPSHOT_EVERY] == ops[SNAPSHOT_EVERY * 2] == "snapshot"
+    assert store.get("홍길동") == record("홍길동", SNAPSHOT_EVERY * 2 + 2)
+
+
+def test_as_of_returns_last_version_at_or_before_timestamp(tmp_path):
+    store = VersionStore(str(tmp_path / "versions.jsonl"))
+    for n in (0, 10, 20):
+        store.append("홍길동", ts(n), record("홍길동", n))
+    assert store.get("홍길동", as_of=ts(15)) == record("홍길동", 10)
+    assert store.get("홍길동", as_of=ts(20)) == record("홍길동", 20)
+    assert store.get("홍길동", as_of=ts(0)) == record("홍길동", 0)
+    assert store.get("홍길동", as_of="2025-01-01 00:00:00") is None
+
+
+def test_delta_only_holds_changed_fields(tmp_path):
+    path = str(tmp_path / "versions.jsonl")
+    store = VersionStore(path)
+    # 공동소유자는 process_pdf 가 tuple 목록으로 돌려준다
+    owners = [("홍길동", "800101-*******")]
+    store.append("홍길동", ts(0), record("홍길동", 0, 공동소유자=owners))
+    store.append("홍길동", ts(1), record("홍길동", 1, 공동소유자=owners))
+    versions = store.list_versions("홍길동")
+    assert [v["구분"] for v in versions] == ["전체", "변경"]
+    assert versions[1]["변경필드"] == "KB시세"
+    assert store.get("홍길동")["공동소유자"] == [["홍길동", "800101-*******"]]
+
+
+def test_delete_hides_customer_but_keeps_history(tmp_path):
+    store = VersionStore(str(tmp_path / "versions.jsonl"))
+    store.append("홍길동", ts(0), record("홍길동", 0))
+    store.append("김철수", ts(1), record("김철수", 1))
+    store.delete("홍길동", ts(2))
+    store.delete("홍길동", ts(3))  # 이미 삭제된 고객은 tombstone 을 다시 쓰지 않음
+    assert store.get("홍길동") is None
+    assert store.get("홍길동", as_of=ts(1)) == record("홍길동", 0)
+    assert set(store.customers()) == {"김철수"}
+    assert [v["구분"] for v in store.list_versions("홍길동")] == ["전체", "삭제"]
+    assert [r["고객명"] for r in store.iter_latest()] == ["김철수"]
+
+    # 삭제 후 다시 저장하면 새 snapshot 부터 복원
+    store.append("홍길동", ts(4), {"고객명": "홍길동", "저장일시": ts(4)})
+    assert store.get("홍길동") == {"고객명": "홍길동", "저장일시": ts(4)}
+    assert store.customers()["홍길동"] == ts(4)
+
+
+def test_reopening_rebuilds_index_from_file(tmp_path):
+    path = str(tmp_path / "versions.jsonl")
+    store = VersionStore(path)
+    for n in range(SNAPSHOT_EVERY + 4):
+        store.append("홍길동", ts(n), record("홍길동", n))
+    store.append("김철수", ts(50), record("김철수", 50))
+    store.delete("김철수", ts(51))
+
+    reopened = VersionStore(path)
+    assert reopened.get("홍길동") == store.get("홍길동")
+    assert reopened.get("홍길동", as_of=ts(5)) == record("홍길동", 5)
+    assert reopened.customers() == {"홍길동": ts(SNAPSHOT_EVERY + 3)}
+    assert len(reopened.list_versions("홍길동")) == SNAPSHOT_EVERY + 4
+
+
+def test_other_writers_appends_are_picked_up_and_partial_line_is_skipped(tmp_path):
+    path = str(tmp_path / "versions.jsonl")
+    reader = VersionStore(path)
+    writer = VersionStore(path)
+    writer.append("홍길동", ts(0), record("홍길동", 0))
+    assert reader.get("홍길동") == record("홍길동", 0)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"고객명": "김철수", "저장일시"')  # 쓰는 중인 줄
+    assert set(reader.customers()) == {"홍길동"}
+
+
+def test_seeding_from_csv_converts_repr_loans(tmp_path, monkeypatch):
+    csv_path = tmp_path / "history.csv"
+    csv_path.write_text(
+        "고객명,대출항목,저장일시\n"
+        "홍길동,\"[{'설정자': '국민', '채권최고액': '12,000', '원금': '10,000', '진행구분': '유지'}]\",2025-06-01 10:00:00\n"
+        "김철수,\"[{'설정자': 'x', '채권최고액': Decimal('1')}]\",2025-06-01 10:00:01\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(history_manager, "HISTORY_FILE", str(csv_path))
+    monkeypatch.setattr(history_manager, "VERSIONS_FILE", str(tmp_path / "versions.jsonl"))
+    monkeypatch.setattr(history_manager, "_version_store", None)
+    store = history_manager.get_version_store()
+    loans = json.loads(store.get("홍길동")["대출항목"])
+    assert loans == [{"lender": "국민", "max_amount": 12000, "ratio": 120, "principal": 10000, "status": "유지"}]
+    # 해석할 수 없는 값은 원래 문자열 그대로
+    assert store.get("김철수")["대출항목"].startswith("[{'설정자'")
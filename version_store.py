@@ -0,0 +1,188 @@
+import os
+import json
+import threading
+from bisect import bisect_right
+
+# ─────────────────────────────
+# 🕓 고객별 저장 이력 (추가 전용 JSONL + (고객명, 저장일시) 인덱스)
+# ─────────────────────────────
+# 한 줄 = 한 버전. 처음과 SNAPSHOT_EVERY 번째 버전마다 전체 값(snapshot)을,
+# 나머지는 직전 버전과 달라진 필드만(delta) 기록한다. 삭제는 tombstone(delete) 한 줄.
+#   {"고객명": "...", "저장일시": "2025-06-01 10:00:00", "v": 3, "op": "delta", "data": {"KB시세": "52,000"}}
+# 인덱스는 고객별로 (저장일시, 파일 오프셋, op) 를 시간순 배열로 들고 있어
+# 최신 / 특정 시점 조회는 bisect 한 번(O(log n)) + 최대 SNAPSHOT_EVERY 줄 읽기로 끝난다.
+
+SNAPSHOT_EVERY = 10
+
+
+class _Entry:
+    __slots__ = ("ts", "offset", "op", "v", "snapshot_pos")
+
+    def __init__(self, ts, offset, op, v, snapshot_pos):
+        self.ts = ts
+        self.offset = offset
+        self.op = op
+        self.v = v
+        self.snapshot_pos = snapshot_pos  # 이 버전을 복원할 때 시작할 snapshot 의 위치
+
+
+class VersionStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._index = {}        # 고객명 -> [_Entry, ...] (저장일시 순)
+        self._timestamps = {}   # 고객명 -> [저장일시, ...] (bisect 용)
+        self._indexed_size = 0  # 인덱스에 반영된 파일 크기
+
+    # ------------------------------
+    # 🔹 인덱스 유지 (새로 추가된 꼬리 부분만 읽음)
+    # ------------------------------
+
+    def _refresh(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size < self._indexed_size:  # 파일이 교체됨 → 전체 재구성
+            self._index, self._timestamps, self._indexed_size = {}, {}, 0
+        if size == self._indexed_size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_size)
+            offset = self._indexed_size
+            for line in f:
+                if line.endswith(b"\n") and line.strip():
+                    rec = json.loads(line)
+                    self._add_to_index(rec, offset)
+                elif not line.endswith(b"\n"):
+                    break  # 쓰는 중인 마지막 줄은 다음에 반영
+                offset += len(line)
+            self._indexed_size = offset
+
+    def _add_to_index(self, rec, offset):
+        name = rec["고객명"]
+        entries = self._index.setdefault(name, [])
+        stamps = self._timestamps.setdefault(name, [])
+        if rec["op"] == "delta" and entries:
+            snapshot_pos = entries[-1].snapshot_pos
+        else:
+            snapshot_pos = len(entries)
+        entries.append(_Entry(rec["저장일시"], offset, rec["op"], rec["v"], snapshot_pos))
+        stamps.append(rec["저장일시"])
+
+    def _read_at(self, f, offset):
+        f.seek(offset)
+        return json.loads(f.readline())
+
+    def _position(self, name, as_of=None):
+        entries = self._index.get(name)
+        if not entries:
+            return None
+        if as_of is None:
+            return len(entries) - 1
+        pos = bisect_right(self._timestamps[name], as_of) - 1
+        return pos if pos >= 0 else None
+
+    def _state_at(self, name, pos):
+        entries = self._index[name]
+        entry = entries[pos]
+        if entry.op == "delete":
+            return None
+        state = {}
+        with open(self.path, "rb") as f:
+            for e in entries[entry.snapshot_pos:pos + 1]:
+                state.update(self._read_at(f, e.offset)["data"])
+        return state
+
+    # ------------------------------
+    # 🔹 조회
+    # ------------------------------
+
+    def get(self, name, as_of=None):
+        with self._lock:
+            self._refresh()
+            pos = self._position(name, as_of)
+            return None if pos is None else self._state_at(name, pos)
+
+    def list_versions(self, name):
+        with self._lock:
+            self._refresh()
+            entries = self._index.get(name, [])
+            if not entries:
+                return []
+            result = []
+            with open(self.path, "rb") as f:
+                for e in entries:
+                    rec = self._read_at(f, e.offset)
+                    changed = [k for k in rec["data"] if k not in ("고객명", "저장일시")]
+                    result.append({
+                        "버전": e.v,
+                        "저장일시": e.ts,
+                        "구분": {"snapshot": "전체", "delta": "변경", "delete": "삭제"}[e.op],
+                        "변경필드": ", ".join(changed) if e.op == "delta" else "",
+                    })
+            return result
+
+    def customers(self):
+        # 삭제되지 않은 고객명 → 마지막 저장일시
+        with self._lock:
+            self._refresh()
+            return {name: entries[-1].ts for name, entries in self._index.items()
+                    if entries and entries[-1].op != "delete"}
+
+    def iter_latest(self):
+        # 삭제되지 않은 고객의 최신 상태를 한 명씩 (마지막 저장순, 파일은 한 번만 연다)
+        # 추가 전용 파일이라 목록을 만든 뒤 다른 저장이 들어와도 기록된 오프셋은 그대로 유효하다
+        with self._lock:
+            self._refresh()
+            targets = sorted(
+                (entries[-1].ts, name, [e.offset for e in entries[entries[-1].snapshot_pos:]])
+                for name, entries in self._index.items()
+                if entries and entries[-1].op != "delete"
+            )
+        if not targets:
+            return
+        with open(self.path, "rb") as f:
+            for _, _, offsets in targets:
+                state = {}
+                for offset in offsets:
+                    state.update(self._read_at(f, offset)["data"])
+                yield state
+
+    # ------------------------------
+    # 🔹 기록 (추가 전용)
+    # ------------------------------
+
+    def _append(self, rec):
+        line = (json.dumps(rec, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(line)
+        self._refresh()
+
+    def append(self, name, timestamp, data):
+        # 저장되는 JSON 형태로 맞춘 뒤 비교 (tuple → list 등, 그대로 비교하면 안 바뀐 필드도 delta 에 들어감)
+        data = json.loads(json.dumps(data, ensure_ascii=False, default=str))
+        with self._lock:
+            self._refresh()
+            entries = self._index.get(name, [])
+            pos = len(entries) - 1
+            prev = self._state_at(name, pos) if entries else None
+            v = entries[-1].v + 1 if entries else 1
+            since_snapshot = pos - entries[pos].snapshot_pos + 1 if entries else 0
+            if entries and timestamp < entries[-1].ts:  # 시간순 유지 (bisect 전제)
+                timestamp = entries[-1].ts
+            if prev is None or since_snapshot >= SNAPSHOT_EVERY:
+                rec = {"고객명": name, "저장일시": timestamp, "v": v, "op": "snapshot", "data": data}
+            else:
+                delta = {k: val for k, val in data.items() if prev.get(k) != val}
+                rec = {"고객명": name, "저장일시": timestamp, "v": v, "op": "delta", "data": delta}
+            self._append(rec)
+            return v
+
+    def delete(self, name, timestamp):
+        with self._lock:
+            self._refresh()
+            entries = self._index.get(name)
+            if not entries or entries[-1].op == "delete":
+                return
+            self._append({"고객명": name, "저장일시": timestamp, "v": entries[-1].v + 1, "op": "delete", "data": {}})
+
+    def is_empty(self):
+        return not os.path.exists(self.path) or os.path.getsize(self.path) == 0